@@ -0,0 +1,49 @@
+"""Benchmark del costo de autenticación por petición: verificación de JWT con y sin caché.
+
+Ejecuta en la terminal: python -m benchmarks.auth [número de peticiones]
+"""
+import os
+import sys
+import time
+
+# el benchmark no necesita mongodb, pero los módulos de la aplicación leen su configuración
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import src.security.security as security
+from src.security.jwt_backends import HMACBackend, JoseBackend
+
+
+def measure(requests: int, decode) -> float:
+    """Retorna los microsegundos por petición de una función de verificación."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        decode()
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    algorithm = security.ALGORITHM
+    token = security.create_access_token(
+        {"sub": "benchmark", "uid": "0" * 24, "role": "employee", "disabled": False, "ver": 0}
+    )
+
+    results = {}
+    for name, backend in (("jose", JoseBackend()), ("hmac", HMACBackend())):
+        results[f"{name} sin caché"] = measure(
+            requests, lambda: backend.decode(token, security.SECRET_KEY, algorithm)
+        )
+
+    security.token_cache.clear()
+    security.decode_token(token) # la primera petición llena la caché
+    results["decode_token con caché"] = measure(requests, lambda: security.decode_token(token))
+
+    print(f"{requests} verificaciones del mismo token ({algorithm})")
+    for name, micros in results.items():
+        print(f"  {name:<24} {micros:8.2f} µs/petición")
+
+
+if __name__ == "__main__":
+    main()
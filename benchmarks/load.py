@@ -0,0 +1,247 @@
+"""Benchmark de carga de la API: latencia p50/p95/p99, throughput y memoria por ruta.
+
+Levanta src.main:app en el mismo proceso contra un mongod local (o un sustituto en
+memoria), siembra datos con volúmenes realistas y genera carga concurrente con
+httpx sobre las rutas de autenticación, listados, filtros, altas y actualizaciones.
+
+Ejecuta en la terminal:
+    python -m benchmarks.load                          # mongod en MONGO_URI (o localhost)
+    python -m benchmarks.load --save                   # guarda la línea base
+    python -m benchmarks.load --stand-in --cars 2000 --rentals 20000 --repairs 8000
+
+Los resultados se comparan con benchmarks/baselines/<nombre>.json; el proceso
+termina con código 1 si alguna ruta empeora más que la tolerancia. El sustituto en
+memoria (--stand-in) requiere `pip install mongomock-motor` y sólo sirve para
+probar el harness, no para medir mongodb.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tracemalloc
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default="drive_and_deal_bench", help="base de datos del benchmark (se reemplaza)")
+    parser.add_argument("--stand-in", action="store_true", help="usa mongomock-motor en lugar de mongod")
+    parser.add_argument("--keep-data", action="store_true", help="reutiliza los datos sembrados previamente")
+    parser.add_argument("--cars", type=int, default=50_000)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--rentals", type=int, default=500_000)
+    parser.add_argument("--repairs", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=2_000, help="peticiones por ruta")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--alloc-requests", type=int, default=50, help="peticiones por ruta para medir memoria")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--name", default="local", help="nombre de la línea base")
+    parser.add_argument("--save", action="store_true", help="guarda los resultados como línea base")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="empeoramiento permitido (0.2 = 20%%)")
+    return parser.parse_args()
+
+
+def configure(args: argparse.Namespace) -> None:
+    """Configura el entorno antes de importar la aplicación."""
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ["MONGO_DB_NAME"] = args.db_name
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("ALGORITHM", "HS256")
+
+    if args.stand_in: # el cliente de motor se reemplaza por uno en memoria
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--stand-in requiere mongomock-motor: pip install mongomock-motor")
+        import motor.motor_asyncio
+
+        class StandInClient(AsyncMongoMockClient):
+            def __init__(self, *args: Any, **kwargs: Any) -> None:
+                super().__init__() # se ignoran las opciones del pool
+
+        motor.motor_asyncio.AsyncIOMotorClient = StandInClient
+
+
+async def seed(db: Any, args: argparse.Namespace) -> dict[str, list]:
+    """Siembra autos, clientes, rentas y reparaciones con el generador de src.tools.seed."""
+    from src.tools.seed import SeedConfig, build_documents, object_id, plan_batches, seed as seed_parallel
+
+    config = SeedConfig(
+        seed=args.seed, cars=args.cars, customers=args.customers, rentals=args.rentals,
+        repairs=args.repairs, end_date=datetime.now(timezone.utc).date(),
+    )
+    if args.stand_in: # el sustituto en memoria sólo existe en este proceso
+        for collection, start, stop in plan_batches(config):
+            await db[collection].insert_many(build_documents(config, collection, start, stop), ordered=False)
+    else:
+        await asyncio.to_thread(seed_parallel, config, args.mongo_uri, args.db_name, os.cpu_count() or 1)
+    return {"cars": [object_id(config, "cars", index) for index in range(config.cars)]}
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Percentil por rango más cercano de una lista ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client: Any, scenario: dict, requests: int, concurrency: int) -> dict[str, Any]:
+    """Ejecuta las peticiones de una ruta con varios trabajadores concurrentes."""
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter: # los trabajadores comparten el contador de peticiones
+            start = time.perf_counter()
+            response = await scenario["send"](client, i)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if status < 400)
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rps": len(latencies) / elapsed,
+        "error_rate": 1 - ok / len(latencies),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+async def measure_allocations(client: Any, scenario: dict, requests: int) -> float:
+    """Memoria máxima asignada por petición (KiB) en una pasada secuencial con tracemalloc."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(requests):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await scenario["send"](client, 10_000_000 + i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+    return percentile(peaks, 0.50) / 1024
+
+
+def build_scenarios(tokens: dict[str, str], ids: dict[str, list], seed: int) -> list[dict]:
+    """Define las rutas medidas: nombre, rol y función que envía una petición."""
+    rng = random.Random(seed)
+    headers = {role: {"Authorization": f"Bearer {token}"} for role, token in tokens.items()}
+    car_ids = [str(id) for id in ids["cars"]]
+    today = datetime.now(timezone.utc).date()
+
+    def get(role: str, path: str) -> Callable:
+        return lambda client, i: client.get(path, headers=headers[role])
+
+    return [
+        {"name": "POST /api/auth/login", "requests": 0.05, "send": lambda client, i: client.post(
+            "/api/auth/login", data={"username": "benchemployee", "password": "benchpassword"})},
+        {"name": "GET /api/cars/", "send": get("employee", "/api/cars/?limit=50")},
+        {"name": "GET /api/cars/filter/", "send": get("employee", "/api/cars/filter/?avaible=true&limit=50")},
+        {"name": "GET /api/rentals/?expand", "send": get("employee", "/api/rentals/?limit=50&expand=customer,car")},
+        {"name": "GET /api/repairs/filter/", "send": get(
+            "owner", f"/api/repairs/filter/?date_from={today - timedelta(days=90)}&mount_min=5000&limit=50")},
+        {"name": "POST /api/customers/", "send": lambda client, i: client.post(
+            "/api/customers/", headers=headers["employee"], json={
+                "name": f"Cliente bench {i}", "email": f"bench{i}@example.com",
+                "phone_number": "5551234567", "address": "Calle Benchmark 1"})},
+        {"name": "PUT /api/cars/{id}", "send": lambda client, i: client.put(
+            f"/api/cars/{rng.choice(car_ids)}", headers=headers["manager"],
+            json={"state": rng.choice(["Disponible", "Taller", "Limpieza"])})},
+    ]
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """Imprime la diferencia contra la línea base y retorna las rutas que empeoraron."""
+    regressions = []
+    print(f"\nComparación contra la línea base (tolerancia {tolerance:.0%}):")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        p95_delta = result["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0
+        rps_delta = result["rps"] / previous["rps"] - 1 if previous["rps"] else 0
+        regressed = p95_delta > tolerance or rps_delta < -tolerance
+        if regressed:
+            regressions.append(name)
+        flag = "REGRESIÓN" if regressed else "ok"
+        print(f"  {name:<28} p95 {p95_delta:+7.1%}  rps {rps_delta:+7.1%}  {flag}")
+    return regressions
+
+
+async def main() -> int:
+    args = parse_args()
+    configure(args)
+
+    import httpx
+    from src.main import app
+    from src.database.db import db, client as mongo_client
+    from src.security.security import get_hashed_password_async
+
+    async with app.router.lifespan_context(app): # índices, pool y tareas en segundo plano
+        if not args.keep_data:
+            await mongo_client.drop_database(args.db_name)
+            started = time.perf_counter()
+            ids = await seed(db, args)
+            print(f"Datos sembrados en {time.perf_counter() - started:.1f} s")
+        else:
+            ids = {"cars": await db.cars.distinct("_id")}
+
+        hashed = await get_hashed_password_async("benchpassword")
+        for role in ("employee", "manager", "owner"):
+            await db.users.update_one({"username": f"bench{role}"}, {"$set": {
+                "username": f"bench{role}", "full_name": f"Bench {role}", "role": role,
+                "disabled": False, "token_version": 0, "hashed_password": hashed,
+            }}, upsert=True)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            tokens = {}
+            for role in ("employee", "manager", "owner"):
+                response = await client.post("/api/auth/login", data={"username": f"bench{role}", "password": "benchpassword"})
+                tokens[role] = response.json()["access_token"]
+
+            results = {}
+            print(f"\n{'ruta':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'KiB/req':>8} {'error':>6}")
+            for scenario in build_scenarios(tokens, ids, args.seed):
+                requests = max(1, int(args.requests * scenario.get("requests", 1)))
+                result = await run_scenario(client, scenario, requests, args.concurrency)
+                result["alloc_kib"] = await measure_allocations(client, scenario, args.alloc_requests)
+                results[scenario["name"]] = result
+                print(
+                    f"{scenario['name']:<28} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+                    f"{result['p99_ms']:8.2f} {result['rps']:9.1f} {result['alloc_kib']:8.1f} "
+                    f"{result['error_rate']:6.1%}"
+                )
+
+    baseline_path = BASELINES_DIR / f"{args.name}.json"
+    if args.save:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nLínea base guardada en {baseline_path}")
+        return 0
+    if baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.tolerance)
+        return 1 if regressions else 0
+    print(f"\nSin línea base en {baseline_path}; usa --save para crearla.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,68 @@
+"""Benchmark de serialización de listados: response_model de FastAPI vs serialización rápida.
+
+Ejecuta en la terminal: python -m benchmarks.serialization [número de documentos]
+"""
+import sys
+import time
+from datetime import datetime, timezone
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import src.responses as responses
+from src.database.mongo_serializers import serialize_doc
+from src.database.queries.rentals import serialize_rental_refs
+from src.schemas.pagination import Page
+from src.schemas.rentals import Rental
+
+
+def build_documents(size: int) -> list[dict]:
+    """Genera documentos de rentas con la forma en que los devuelve motor."""
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "id_customer": ObjectId(),
+            "id_car": ObjectId(),
+            "start_date": now,
+            "total_amount": 1500.0 + i,
+            "returned": bool(i % 2),
+        }
+        for i in range(size)
+    ]
+
+
+def build_page(documents: list[dict]) -> dict:
+    """Serializa los documentos como lo hace paginate()."""
+    items = [serialize_doc(serialize_rental_refs(dict(document))) for document in documents]
+    return {"items": items, "next_cursor": None}
+
+
+def main(size: int, rounds: int = 5) -> None:
+    documents = build_documents(size)
+    responses.FAST_JSON_RESPONSES = True # se habilita para la ruta rápida del benchmark
+
+    app = FastAPI()
+
+    @app.get("/model", response_model=Page[Rental])
+    async def with_response_model():
+        return build_page(documents)
+
+    @app.get("/fast", response_model=Page[Rental])
+    async def with_fast_path():
+        return responses.fast_json_response(Page[Rental], build_page(documents))
+
+    client = TestClient(app)
+    assert client.get("/model").json() == client.get("/fast").json() # misma forma de json
+
+    for path in ("/model", "/fast"):
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            client.get(path)
+            best = min(best, time.perf_counter() - start)
+        print(f"{path:7} {best * 1000:8.1f} ms por respuesta  {best / size * 1e6:6.2f} µs por documento")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
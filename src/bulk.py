@@ -0,0 +1,124 @@
+import os # interacción con el sistema operativo
+import json # decodificación del cuerpo de la petición
+from typing import Any, Awaitable, Callable # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from fastapi import HTTPException, Request # excepciones y petición http
+from pydantic import BaseModel, ValidationError # validación de los elementos
+
+load_dotenv() # se cargan las variables de entorno
+
+# número máximo de elementos aceptados en una sola petición masiva
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 10000))
+
+# tipos de contenido que se interpretan como un json por línea
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+
+# descripción del cuerpo de las rutas masivas para la documentación automática
+BULK_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+
+class InvalidItem:
+    """Elemento de un cuerpo NDJSON que no es un json válido."""
+
+    def __init__(self, error: str) -> None:
+        self.error = error
+
+
+async def read_bulk_items(request: Request) -> list[Any]:
+    """Función que obtiene los elementos de una petición masiva en json o NDJSON.
+
+    Args:
+        request (Request): Petición http
+
+    Raises:
+        HTTPException: 400 si el cuerpo no es válido, 413 si excede BULK_MAX_ITEMS
+
+    Returns:
+        list[Any]: Elementos de la petición sin validar
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_CONTENT_TYPES: # un elemento por línea
+        items = []
+        for line in body.splitlines():
+            if not line.strip(): # se ignoran las líneas vacías
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError: # la línea se reporta con error sin rechazar el resto
+                items.append(InvalidItem("La línea no es un json válido."))
+    else: # un arreglo json
+        try:
+            items = json.loads(body)
+        except ValueError:
+            items = None
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code = 400,
+                detail = "El cuerpo debe ser un arreglo json o NDJSON."
+            )
+
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code = 413,
+            detail = f"Se permiten como máximo {BULK_MAX_ITEMS} elementos por petición."
+        )
+    return items
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Función que resume los errores de validación de un elemento en una línea."""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in detail['loc']) or 'body'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+async def run_bulk(
+    items: list[Any],
+    model: type[BaseModel],
+    write: Callable[[list[dict[str, Any]]], Awaitable[list[dict[str, Any]]]],
+) -> dict[str, Any]:
+    """Función que valida los elementos con un esquema, escribe los válidos y genera el reporte.
+
+    Args:
+        items (list[Any]): Elementos de la petición
+        model (type[BaseModel]): Esquema con el que se valida cada elemento
+        write (Callable): Función que escribe los elementos válidos y retorna su resultado
+
+    Returns:
+        dict[str, Any]: Reporte con el resultado de cada elemento
+    """
+    results: list[dict[str, Any]] = [{} for _ in items]
+    positions, documents = [], [] # elementos válidos y su posición
+
+    for index, item in enumerate(items): # se valida cada elemento en una sola pasada
+        if isinstance(item, InvalidItem):
+            results[index] = {"index": index, "status": "error", "error": item.error}
+            continue
+        try:
+            documents.append(model.model_validate(item).model_dump())
+            positions.append(index)
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "error", "error": format_validation_error(e)}
+
+    if documents: # se escriben todos los elementos válidos
+        for index, result in zip(positions, await write(documents)):
+            results[index] = {"index": index, **result}
+
+    succeeded = sum(1 for result in results if result["status"] in ("created", "updated"))
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "items": results,
+    }
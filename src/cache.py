@@ -0,0 +1,198 @@
+import os # interacción con el sistema operativo
+import time # reloj monotónico para las expiraciones
+from abc import ABC, abstractmethod # interfaz de los backends
+from collections import OrderedDict # diccionario ordenado para el orden LRU
+from typing import Any, Awaitable, Callable, Hashable # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from src.metrics import Counter # métricas en formato prometheus
+
+load_dotenv() # se cargan las variables de entorno
+
+cache_requests = Counter(
+    "response_cache_requests_total",
+    "Lecturas e invalidaciones de la caché de respuestas por espacio de nombres",
+    ("namespace", "result"),
+)
+
+
+class TTLCache:
+    """Caché en memoria acotada por tamaño (LRU) y por tiempo de vida (TTL).
+
+    Está pensada para usarse desde el event loop, por lo que no requiere candados.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Constructor de la caché.
+
+        Args:
+            maxsize (int): Número máximo de entradas (0 deshabilita la caché)
+            ttl (float): Segundos que una entrada permanece válida
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0 # número de lecturas encontradas
+        self.misses = 0 # número de lecturas no encontradas o expiradas
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Método que obtiene una entrada si existe y no ha expirado.
+
+        Args:
+            key (Hashable): Llave de la entrada
+            default (Any): Valor retornado si no se encuentra la entrada
+
+        Returns:
+            Any: Valor almacenado o el valor por defecto
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic(): # si la entrada expiró se elimina
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key) # se marca como usada recientemente
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Método que almacena una entrada y descarta la menos usada si se excede el tamaño.
+
+        Args:
+            key (Hashable): Llave de la entrada
+            value (Any): Valor a almacenar
+            ttl (float | None): Tiempo de vida de la entrada (opcional)
+        """
+        if self.maxsize <= 0: # la caché está deshabilitada
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize: # se descartan las entradas más antiguas
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Método que invalida una entrada.
+
+        Args:
+            key (Hashable): Llave de la entrada
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Método que invalida todas las entradas."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(ABC):
+    """Interfaz de los backends de la caché de respuestas.
+
+    El backend por defecto vive en memoria del proceso; un backend compartido
+    (p. ej. redis) debe implementar todos estos métodos para poder instanciarse.
+    La invalidación no depende del backend: usa la versión compartida de la colección.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        """Retorna el valor de una llave o None si no existe o expiró."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Guarda el valor de una llave durante ttl segundos."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Backend de caché en memoria del proceso con LRU y TTL."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.entries = TTLCache(maxsize=maxsize, ttl=0)
+
+    async def get(self, key: str) -> Any:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.entries.set(key, value, ttl)
+
+
+cache_backend: CacheBackend = MemoryCacheBackend(
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", 512))
+)
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Función que reemplaza el backend de la caché de respuestas (p. ej. uno compartido)."""
+    global cache_backend
+    cache_backend = backend
+
+
+class ResponseCache:
+    """Caché de resultados de consultas agrupados en un espacio de nombres.
+
+    Cada espacio tiene una generación: invalidarlo sólo incrementa la generación,
+    por lo que todas sus entradas dejan de usarse sin recorrerlas. La generación es
+    un contador compartido en mongodb (la versión de la colección), de modo que una
+    escritura en cualquier proceso invalida la caché de todos los procesos.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        version: Callable[[], Awaitable[int]],
+        bump: Callable[[], Awaitable[None]],
+    ) -> None:
+        """Constructor de la caché.
+
+        Args:
+            namespace (str): Espacio de nombres de las entradas
+            ttl (float): Segundos que una entrada permanece válida (0 la deshabilita)
+            version (Callable[[], Awaitable[int]]): Función que lee la generación compartida
+            bump (Callable[[], Awaitable[None]]): Función que incrementa la generación compartida
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.version = version
+        self.bump = bump
+
+    async def generation(self) -> int:
+        return await self.version()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Método que obtiene un resultado de la caché o lo carga y lo almacena.
+
+        Args:
+            key (Hashable): Llave de la consulta (p. ej. función y argumentos)
+            loader (Callable[[], Awaitable[Any]]): Función que ejecuta la consulta
+
+        Returns:
+            Any: Resultado de la consulta
+        """
+        if self.ttl <= 0: # la caché está deshabilitada
+            return await loader()
+
+        generation = await self.generation()
+        cache_key = f"{self.namespace}:{generation}:{key!r}"
+        value = await cache_backend.get(cache_key)
+        if value is not None:
+            cache_requests.inc(self.namespace, "hit")
+            return value
+
+        cache_requests.inc(self.namespace, "miss")
+        value = await loader()
+        # sólo se guarda si nadie invalidó la caché mientras se cargaba
+        if generation == await self.generation():
+            await cache_backend.set(cache_key, value, self.ttl)
+        return value
+
+    async def invalidate(self) -> None:
+        """Método que invalida todas las entradas del espacio de nombres en todos los procesos."""
+        await self.bump()
+        cache_requests.inc(self.namespace, "invalidation")
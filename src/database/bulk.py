@@ -0,0 +1,129 @@
+import os # interacción con el sistema operativo
+from typing import Any, Callable # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from bson import ObjectId # clase para el id de mongodb
+from bson.errors import InvalidId # error de un id mal formado
+from pymongo import UpdateOne # operación de actualización para bulk_write
+from pymongo.errors import BulkWriteError # errores por documento de una escritura masiva
+from src.database.changes import now # fecha de modificación para la sincronización
+
+load_dotenv() # se cargan las variables de entorno
+
+# documentos enviados a mongodb en cada insert_many / bulk_write
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 1000))
+
+
+def write_errors(error: BulkWriteError) -> dict[int, str]:
+    """Función que obtiene el mensaje de error de cada operación fallida de un lote.
+
+    Args:
+        error (BulkWriteError): Error de la escritura masiva
+
+    Returns:
+        dict[int, str]: Mensaje de error por posición dentro del lote
+    """
+    return {
+        write_error["index"]: write_error.get("errmsg", "Error de escritura.")
+        for write_error in error.details.get("writeErrors", [])
+    }
+
+
+async def bulk_insert(
+    collection: Any,
+    documents: list[dict[str, Any]],
+    prepare: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> list[dict[str, Any]]:
+    """Función que inserta documentos en lotes sin orden y reporta el resultado de cada uno.
+
+    Un error en un documento no detiene la inserción del resto del lote.
+
+    Args:
+        collection (Any): Colección de mongodb
+        documents (list[dict[str, Any]]): Documentos ya validados
+        prepare (Callable | None): Función que completa cada documento antes de insertarlo;
+            si lanza InvalidId o ValueError el documento se reporta con error
+        chunk_size (int): Documentos por cada insert_many
+
+    Returns:
+        list[dict[str, Any]]: Resultado de cada documento en el mismo orden
+    """
+    results: list[dict[str, Any]] = [{} for _ in documents]
+
+    pending = [] # posiciones y documentos listos para insertarse
+    for position, document in enumerate(documents):
+        try:
+            pending.append((position, prepare(document) if prepare else document))
+        except (InvalidId, ValueError) as e:
+            results[position] = {"status": "error", "error": str(e)}
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        errors = {} # errores por posición dentro del lote
+        try: # pymongo asigna el _id de cada documento antes de enviarlo
+            await collection.insert_many([document for _, document in chunk], ordered=False)
+        except BulkWriteError as e:
+            errors = write_errors(e)
+
+        for index, (position, document) in enumerate(chunk):
+            if index in errors:
+                results[position] = {"status": "error", "error": errors[index]}
+            else:
+                results[position] = {"status": "created", "id": str(document["_id"])}
+    return results
+
+
+async def bulk_update(
+    collection: Any,
+    updates: list[dict[str, Any]],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> list[dict[str, Any]]:
+    """Función que actualiza documentos en lotes sin orden y reporta el resultado de cada uno.
+
+    Cada actualización contiene el "id" del documento y los campos a modificar;
+    los campos None se ignoran al igual que en las actualizaciones individuales.
+
+    Args:
+        collection (Any): Colección de mongodb
+        updates (list[dict[str, Any]]): Actualizaciones ya validadas
+        chunk_size (int): Operaciones por cada bulk_write
+
+    Returns:
+        list[dict[str, Any]]: Resultado de cada actualización en el mismo orden
+    """
+    results: list[dict[str, Any]] = [{} for _ in updates]
+
+    pending = [] # posiciones, ids y operaciones listas para enviarse
+    for position, update in enumerate(updates):
+        try:
+            id = ObjectId(update["id"])
+        except InvalidId:
+            results[position] = {"status": "error", "id": update["id"], "error": "El ID proporcionado no es válido."}
+            continue
+        fields = {k: v for k, v in update.items() if k != "id" and v is not None}
+        fields["updated_at"] = now() # fecha de modificación para la sincronización
+        pending.append((position, id, UpdateOne({"_id": id}, {"$set": fields})))
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        errors = {} # errores por posición dentro del lote
+        try:
+            result = await collection.bulk_write([operation for _, _, operation in chunk], ordered=False)
+            matched = result.matched_count
+        except BulkWriteError as e:
+            errors = write_errors(e)
+            matched = e.details.get("nMatched", 0)
+
+        ids = [id for _, id, _ in chunk]
+        existing = set(ids)
+        if matched < len(chunk) - len(errors): # sólo se consulta si hubo ids no encontrados
+            existing = {doc["_id"] async for doc in collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+
+        for index, (position, id, _) in enumerate(chunk):
+            if index in errors:
+                results[position] = {"status": "error", "id": str(id), "error": errors[index]}
+            elif id not in existing:
+                results[position] = {"status": "not_found", "id": str(id)}
+            else:
+                results[position] = {"status": "updated", "id": str(id)}
+    return results
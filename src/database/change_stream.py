@@ -0,0 +1,212 @@
+import os # interacción con el sistema operativo
+import json # codificación de los eventos
+import asyncio # colas y tareas del event loop
+import logging # registro de eventos de la aplicación
+from typing import Any, AsyncIterator # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from pymongo.errors import OperationFailure # errores de los comandos de mongodb
+from src.database.db import db # base de datos en mongodb
+from src.metrics import Counter, Gauge # métricas en formato prometheus
+from src.responses import json_default # conversión de tipos no soportados por json
+
+load_dotenv() # se cargan las variables de entorno
+
+logger = logging.getLogger(__name__)
+
+# eventos pendientes por cliente antes de considerarlo lento y desconectarlo
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", 100))
+# segundos sin eventos tras los que se envía un comentario para mantener viva la conexión
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("STREAM_KEEPALIVE_SECONDS", 15))
+# segundos de espera antes de reabrir el change stream tras un error
+STREAM_RETRY_SECONDS = float(os.getenv("STREAM_RETRY_SECONDS", 5))
+
+# campos de cada colección que se envían en los eventos
+STREAM_FIELDS = {
+    "cars": ("avaible", "state", "license_plate"),
+    "rentals": ("id_car", "id_customer", "returned"),
+}
+
+stream_events = Counter(
+    "stream_events_total",
+    "Eventos de cambios difundidos a los suscriptores por colección",
+    ("collection",),
+)
+stream_dropped = Counter(
+    "stream_dropped_subscribers_total",
+    "Suscriptores desconectados por no consumir sus eventos a tiempo",
+)
+
+
+def to_event(change: dict[str, Any]) -> dict[str, Any] | None:
+    """Función que convierte un evento del change stream al evento enviado a los clientes.
+
+    Args:
+        change (dict[str, Any]): Evento del change stream de mongodb
+
+    Returns:
+        dict[str, Any] | None: Evento con los campos relevantes, o None si se ignora
+    """
+    operation = change.get("operationType")
+    if operation not in ("insert", "update", "replace", "delete"): # p. ej. drop o invalidate
+        return None
+
+    collection = change["ns"]["coll"]
+    document = change.get("fullDocument") or {} # None en eliminaciones
+    event = {"collection": collection, "operation": operation, "id": str(change["documentKey"]["_id"])}
+    for field in STREAM_FIELDS.get(collection, ()):
+        value = document.get(field)
+        # las referencias se envían como str al igual que en la api
+        event[field] = str(value) if field.startswith("id_") and value is not None else value
+    return event
+
+
+def encode_event(event: dict[str, Any]) -> bytes:
+    """Función que codifica un evento en formato Server-Sent Events."""
+    data = json.dumps(event, default=json_default)
+    return f"event: {event['collection']}\ndata: {data}\n\n".encode("utf-8")
+
+
+class Subscriber:
+    """Cliente suscrito a los eventos con su cola acotada."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize) # None indica el cierre
+        self.dropped = False # True si se desconectó por ser lento
+
+
+class ChangeBroadcaster:
+    """Difusor de un único change stream de mongodb a todos los suscriptores del proceso.
+
+    El change stream se abre con el primer suscriptor y se cierra con el último.
+    Cada evento se codifica una sola vez y se encola sin bloquear en cada
+    suscriptor; si la cola de un suscriptor está llena se le desconecta para que
+    un cliente lento no retrase a los demás ni acumule memoria.
+    """
+
+    def __init__(self, database: Any, collections: tuple[str, ...], queue_size: int = STREAM_QUEUE_SIZE) -> None:
+        """Constructor del difusor.
+
+        Args:
+            database (Any): Base de datos de mongodb
+            collections (tuple[str, ...]): Colecciones observadas
+            queue_size (int): Eventos pendientes permitidos por suscriptor
+        """
+        self.database = database
+        self.collections = collections
+        self.queue_size = queue_size
+        self.subscribers: set[Subscriber] = set()
+        self.task: asyncio.Task | None = None # tarea que lee el change stream
+        self.resume_token: Any = None # último evento leído para reanudar tras un error
+
+    def subscribe(self) -> Subscriber:
+        """Método que registra un suscriptor y abre el change stream si no está abierto."""
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.watch())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Método que elimina un suscriptor y cierra el change stream si ya no hay ninguno."""
+        self.subscribers.discard(subscriber)
+        if not self.subscribers and self.task is not None:
+            self.task.cancel()
+            self.task = None
+            self.resume_token = None # un nuevo suscriptor sólo recibe eventos nuevos
+
+    def publish(self, event: dict[str, Any]) -> None:
+        """Método que encola un evento en todos los suscriptores sin bloquear.
+
+        Args:
+            event (dict[str, Any]): Evento a difundir
+        """
+        message = encode_event(event) # se codifica una sola vez para todos
+        stream_events.inc(event["collection"])
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull: # el cliente no consume a tiempo
+                self.drop(subscriber)
+
+    def drop(self, subscriber: Subscriber, slow: bool = True) -> None:
+        """Método que desconecta a un suscriptor descartando sus eventos pendientes.
+
+        Args:
+            subscriber (Subscriber): Suscriptor a desconectar
+            slow (bool): True si se desconecta por no consumir sus eventos a tiempo
+        """
+        self.subscribers.discard(subscriber)
+        subscriber.dropped = slow
+        while not subscriber.queue.empty(): # se libera la memoria de la cola
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None) # se indica el cierre al generador del cliente
+        if slow:
+            stream_dropped.inc()
+
+    async def watch(self) -> None:
+        """Método que lee el change stream y difunde sus eventos, reabriéndolo tras un error."""
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self.collections)}}}]
+        while True:
+            try:
+                async with self.database.watch(
+                    pipeline, full_document="updateLookup", resume_after=self.resume_token
+                ) as stream:
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        event = to_event(change)
+                        if event is not None:
+                            self.publish(event)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e: # p. ej. sin replica set o historial perdido
+                logger.warning("Error en el change stream: %s", e)
+                self.resume_token = None
+            except Exception as e: # p. ej. errores de red
+                logger.warning("Error en el change stream: %s", e)
+            await asyncio.sleep(STREAM_RETRY_SECONDS)
+
+    def close(self) -> None:
+        """Método que cierra el change stream y termina las conexiones de los suscriptores."""
+        for subscriber in list(self.subscribers):
+            self.drop(subscriber, slow=False)
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+
+async def event_stream(broadcaster: ChangeBroadcaster) -> AsyncIterator[bytes]:
+    """Generador de Server-Sent Events para un cliente suscrito.
+
+    Args:
+        broadcaster (ChangeBroadcaster): Difusor al que se suscribe el cliente
+
+    Returns:
+        AsyncIterator[bytes]: Eventos codificados y comentarios de keep-alive
+    """
+    subscriber = broadcaster.subscribe()
+    try:
+        yield b": connected\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError: # se mantiene viva la conexión ante proxies
+                yield b": keepalive\n\n"
+                continue
+
+            if message is None: # el difusor cerró la suscripción
+                if subscriber.dropped: # el cliente debe resincronizar con /changes
+                    yield b"event: dropped\ndata: {}\n\n"
+                break
+            yield message
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+# único change stream del proceso para la disponibilidad de autos y las rentas
+car_stream = ChangeBroadcaster(db, ("cars", "rentals"))
+
+Gauge(
+    "stream_subscribers",
+    "Clientes suscritos al stream de autos",
+    lambda: len(car_stream.subscribers),
+)
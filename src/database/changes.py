@@ -0,0 +1,219 @@
+import os # interacción con el sistema operativo
+import base64 # codificación del token opaco
+import logging # registro de eventos de la aplicación
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from bson import ObjectId, json_util # id de mongodb y serialización json de bson
+from pymongo import ASCENDING, IndexModel # definición de índices
+from src.database.db import db # base de datos en mongodb
+from src.database.indexes import register_indexes # registro de índices
+from src.database.mongo_serializers import serialize_doc # serializador de documentos
+from src.database.pagination import MAX_PAGE_LIMIT, InvalidCursor # límites y errores de cursor
+
+load_dotenv() # se cargan las variables de entorno
+
+logger = logging.getLogger(__name__)
+
+# segundos que se vuelven a revisar en cada consulta para no perder escrituras concurrentes.
+# updated_at se fija en la aplicación antes de confirmar la escritura, por lo que este valor
+# debe cubrir: la diferencia entre los relojes de los procesos (sync_clock los alinea con el
+# de mongodb, con un error de la mitad de la latencia de red) más el tiempo máximo entre que
+# se fija updated_at y se confirma la escritura. Una escritura que tarde más en confirmarse
+# no se entrega en /changes hasta su siguiente modificación.
+CHANGES_SAFETY_SECONDS = float(os.getenv("CHANGES_SAFETY_SECONDS", 5))
+# días que se conservan las marcas de eliminación
+TOMBSTONE_TTL_DAYS = int(os.getenv("TOMBSTONE_TTL_DAYS", 30))
+
+
+tombstones = db.tombstones # colección para registrar eliminaciones
+
+# índices para consultar eliminaciones por colección y expirarlas automáticamente
+register_indexes(
+    "tombstones",
+    IndexModel(
+        [("collection", ASCENDING), ("deleted_at", ASCENDING), ("_id", ASCENDING)],
+        name="collection_deleted_at_id"
+    ),
+    IndexModel(
+        [("deleted_at", ASCENDING)],
+        expireAfterSeconds=TOMBSTONE_TTL_DAYS * 24 * 60 * 60,
+        name="deleted_at_ttl"
+    ),
+)
+
+
+clock_offset = timedelta(0) # diferencia entre el reloj de mongodb y el del proceso
+
+
+def now() -> datetime:
+    """Función que retorna la fecha y hora actual en UTC con precisión de milisegundos (BSON).
+
+    Usa el reloj del proceso corregido con la diferencia medida por sync_clock, por lo
+    que todos los procesos fijan updated_at con el reloj del servidor de mongodb.
+    """
+    current = datetime.now(timezone.utc) + clock_offset
+    return current.replace(microsecond=current.microsecond // 1000 * 1000)
+
+
+async def sync_clock(database: Any) -> timedelta:
+    """Función que mide la diferencia entre el reloj del proceso y el de mongodb.
+
+    Args:
+        database (Any): Base de datos de mongodb
+
+    Returns:
+        timedelta: Diferencia aplicada por now() (se conserva la anterior si falla)
+    """
+    global clock_offset
+    before = datetime.now(timezone.utc)
+    try:
+        hello = await database.command("hello")
+    except Exception as e: # se conserva el reloj del proceso
+        logger.warning("No se pudo leer el reloj de mongodb: %s", e)
+        return clock_offset
+    after = datetime.now(timezone.utc)
+
+    server_time = hello["localTime"]
+    if server_time.tzinfo is None: # el driver retorna fechas UTC sin zona horaria
+        server_time = server_time.replace(tzinfo=timezone.utc)
+    # se compara con el punto medio de la petición para descontar la latencia
+    clock_offset = server_time - (before + (after - before) / 2)
+    if abs(clock_offset) > timedelta(seconds=CHANGES_SAFETY_SECONDS / 2):
+        logger.warning("El reloj del proceso difiere %s del de mongodb", clock_offset)
+    return clock_offset
+
+
+def encode_token(updated_at: datetime, id: ObjectId | None = None) -> str:
+    """Función que genera el token opaco de sincronización.
+
+    Args:
+        updated_at (datetime): Fecha desde la que se consultarán los cambios
+        id (ObjectId | None): Último documento entregado con esa fecha (opcional)
+
+    Returns:
+        str: Token codificado en base64 url-safe
+    """
+    raw = json_util.dumps({"t": updated_at, "id": id}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    """Función que decodifica un token generado por encode_token.
+
+    Args:
+        token (str): Token recibido del cliente
+
+    Raises:
+        InvalidCursor: Si el token está mal formado
+
+    Returns:
+        dict[str, Any]: Fecha y último id del token
+    """
+    try:
+        padding = "=" * (-len(token) % 4) # se restaura el relleno eliminado
+        payload = json_util.loads(base64.urlsafe_b64decode(token + padding))
+        if not isinstance(payload.get("t"), datetime):
+            raise ValueError
+        return payload
+    except Exception:
+        raise InvalidCursor("El token de sincronización no es válido.")
+
+
+async def record_deletion(collection_name: str, id: ObjectId) -> None:
+    """Función que registra la eliminación de un documento para la sincronización.
+
+    Args:
+        collection_name (str): Nombre de la colección
+        id (ObjectId): ID del documento eliminado
+    """
+    await tombstones.insert_one({"collection": collection_name, "id": id, "deleted_at": now()})
+
+
+def after_position(field: str, token: dict[str, Any]) -> dict[str, Any]:
+    """Función que construye el filtro para continuar después de una posición (fecha, id).
+
+    Args:
+        field (str): Campo de fecha por el que se recorre la colección
+        token (dict[str, Any]): Token decodificado
+
+    Returns:
+        dict[str, Any]: Filtro de mongodb
+    """
+    if token.get("id") is None: # se revisa de nuevo la ventana desde la fecha del token
+        return {field: {"$gte": token["t"]}}
+    return {"$or": [
+        {field: {"$gt": token["t"]}},
+        {field: token["t"], "_id": {"$gt": token["id"]}},
+    ]}
+
+
+async def find_changes(
+    collection: Any,
+    since: str | None = None,
+    limit: int = MAX_PAGE_LIMIT,
+    transform: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Función que obtiene los documentos modificados y eliminados desde un token.
+
+    Los documentos modificados (por updated_at, _id) y las eliminaciones (por
+    deleted_at, _id) se recorren como un solo flujo ordenado por (fecha, id), y cada
+    respuesta entrega a lo más limit elementos entre ambos. Cuando no hay más páginas
+    el siguiente token retrocede CHANGES_SAFETY_SECONDS para volver a incluir
+    escrituras que terminaron tarde; los clientes deben aplicar los cambios de forma
+    idempotente. La carga inicial no incluye eliminaciones, ya que el cliente no
+    tiene copia de esos documentos.
+
+    Args:
+        collection (Any): Colección de mongodb
+        since (str | None): Token de la consulta anterior (None para la carga inicial)
+        limit (int): Número máximo de documentos modificados y eliminados por respuesta
+        transform (Callable | None): Función aplicada a cada documento antes de serializarlo
+
+    Raises:
+        InvalidCursor: Si el token no es válido
+
+    Returns:
+        dict[str, Any]: Documentos modificados, ids eliminados y siguiente token
+    """
+    limit = max(1, min(limit, MAX_PAGE_LIMIT)) # se acota el tamaño de página
+    started_at = now() # fecha de la consulta
+
+    # se pide un elemento extra de cada flujo para saber si existe una página siguiente
+    # cada elemento es (fecha, id de la posición, documento modificado o None, id eliminado)
+    items: list[tuple[datetime, ObjectId, dict[str, Any] | None, ObjectId | None]] = []
+    if since: # se continúa desde el token anterior
+        token = decode_token(since)
+        query = after_position("updated_at", token)
+        deleted_query = {"collection": collection.name, **after_position("deleted_at", token)}
+        cursor = tombstones.find(deleted_query, {"id": 1, "deleted_at": 1})
+        cursor = cursor.sort([("deleted_at", ASCENDING), ("_id", ASCENDING)]).limit(limit + 1)
+        async for tombstone in cursor:
+            items.append((tombstone["deleted_at"], tombstone["_id"], None, tombstone["id"]))
+    else: # carga inicial sin eliminaciones
+        query = {"updated_at": {"$exists": True}}
+
+    cursor = collection.find(query).sort([("updated_at", ASCENDING), ("_id", ASCENDING)])
+    async for document in cursor.limit(limit + 1):
+        items.append((document["updated_at"], document["_id"], document, None))
+
+    # se combinan ambos flujos por (fecha, id) y se corta la página
+    items.sort(key=lambda item: (item[0], item[1]))
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    if has_more: # la siguiente página inicia después del último elemento entregado
+        last_time, last_id, _, _ = items[-1]
+        next_token = encode_token(last_time, last_id)
+    else: # se vuelve a revisar una ventana corta por escrituras concurrentes
+        next_token = encode_token(started_at - timedelta(seconds=CHANGES_SAFETY_SECONDS))
+
+    changed, deleted = [], []
+    for _, _, document, deleted_id in items:
+        if document is None: # eliminación
+            deleted.append(str(deleted_id))
+            continue
+        if transform: # se serializa cada documento modificado
+            document = transform(document)
+        changed.append(serialize_doc(document))
+    return {"changed": changed, "deleted": deleted, "next_token": next_token, "has_more": has_more}
@@ -0,0 +1,131 @@
+import asyncio # tareas y futuros compartidos
+import functools # preservación de la firma de las funciones decoradas
+from collections import defaultdict # contadores por colección
+from typing import Any, Awaitable, Callable, Hashable # tipado de python
+from src.metrics import Counter # métricas en formato prometheus
+
+
+coalesced_calls = Counter(
+    "coalesced_reads_total",
+    "Lecturas ejecutadas o unidas a una lectura idéntica en curso",
+    ("function", "result"),
+)
+
+
+class InFlight:
+    """Lectura en curso compartida por todas las llamadas idénticas concurrentes."""
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0 # llamadas esperando el resultado
+
+
+in_flight: dict[Hashable, InFlight] = {} # lecturas en curso por llave
+generations: defaultdict[str, int] = defaultdict(int) # escrituras terminadas por colección
+pending_writes: defaultdict[str, int] = defaultdict(int) # escrituras en curso por colección
+
+
+async def single_flight(key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Función que comparte una misma lectura entre llamadas idénticas concurrentes.
+
+    La primera llamada ejecuta la lectura y las demás esperan su resultado. Los
+    errores se propagan a todas las llamadas, y cancelar una llamada no afecta a
+    las demás; la lectura se cancela sólo si ya nadie la espera.
+
+    Args:
+        key (Hashable): Llave de la lectura (función y argumentos)
+        loader (Callable[[], Awaitable[Any]]): Función que ejecuta la lectura
+
+    Returns:
+        Any: Resultado de la lectura
+    """
+    flight = in_flight.get(key)
+    if flight is None: # no hay una lectura idéntica en curso
+        flight = in_flight[key] = InFlight(asyncio.ensure_future(loader()))
+        flight.task.add_done_callback(lambda task: finish(key, flight))
+
+    flight.waiters += 1
+    try:
+        # shield evita que cancelar a una llamada cancele la lectura compartida
+        return await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        if flight.waiters == 1 and not flight.task.done(): # nadie más la espera
+            # se retira antes de cancelarla para que una llamada nueva no se una a ella
+            if in_flight.get(key) is flight:
+                del in_flight[key]
+            flight.task.cancel()
+        raise
+    finally:
+        flight.waiters -= 1
+
+
+def finish(key: Hashable, flight: InFlight) -> None:
+    """Función que retira una lectura terminada del registro de lecturas en curso."""
+    if in_flight.get(key) is flight:
+        del in_flight[key]
+    if not flight.task.cancelled():
+        flight.task.exception() # se marca el error como recuperado si nadie lo esperó
+
+
+def writes(*collections: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorador para las funciones que escriben en las colecciones dadas.
+
+    Mientras la escritura está en curso las lecturas de esas colecciones no se
+    agrupan, y al terminar se cambia su generación, por lo que una lectura que
+    llega después de confirmada la escritura nunca se une a una lectura iniciada
+    antes de ella.
+
+    Args:
+        *collections (str): Colecciones que modifica la función
+
+    Returns:
+        Callable: Decorador de la función de escritura
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            for collection in collections:
+                pending_writes[collection] += 1
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                for collection in collections:
+                    pending_writes[collection] -= 1
+                    generations[collection] += 1
+
+        return wrapper
+    return decorator
+
+
+def coalesce(*collections: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorador que agrupa las llamadas concurrentes con los mismos argumentos.
+
+    Sólo se agrupan llamadas de la misma generación de las colecciones leídas y
+    sin escrituras en curso sobre ellas (ver writes), por lo que no se agrega
+    desactualización dentro del proceso. Entre procesos, una lectura puede unirse
+    a otra iniciada antes de una escritura hecha en otro proceso, como máximo
+    durante lo que tarda esa lectura.
+
+    Args:
+        *collections (str): Colecciones que lee la función
+
+    Returns:
+        Callable: Decorador de la función de lectura asíncrona
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if any(pending_writes[collection] for collection in collections):
+                # la escritura puede confirmarse en cualquier momento: se lee sin agrupar
+                coalesced_calls.inc(name, "bypassed")
+                return await func(*args, **kwargs)
+
+            generation = tuple(generations[collection] for collection in collections)
+            key = (func.__module__, name, generation, args, tuple(sorted(kwargs.items())))
+            coalesced_calls.inc(name, "joined" if key in in_flight else "executed")
+            return await single_flight(key, lambda: func(*args, **kwargs))
+
+        return wrapper
+    return decorator
@@ -1,14 +1,94 @@
 import os # interacción con el sistema operativo
+import asyncio # ejecución concurrente del pre-calentamiento
+from contextlib import asynccontextmanager # context managers asíncronos
+from typing import Any, AsyncIterator # tipado de python
 from dotenv import load_dotenv # función para cargar de variables entorno
-from motor.motor_asyncio import AsyncIOMotorClient # cliente de conexión asíncrono a mongodb 
+from motor.motor_asyncio import AsyncIOMotorClient # cliente de conexión asíncrono a mongodb
+from src.database.monitoring import pool_stats, command_metrics # listeners del driver
 
 load_dotenv() # se cargan las variables de entorno
 
 # desde una variable de entorno se obtiene la cadena de conexión a mongo
-MONGO_URI = os.getenv("MONGO_URI") 
+MONGO_URI = os.getenv("MONGO_URI")
+# nombre de la base de datos (p. ej. una base aparte para benchmarks)
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "drive_and_deal_app")
+
+# configuración del pool de conexiones desde variables de entorno
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 10))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "") # p. ej. "zstd,snappy"
+# las transacciones requieren un replica set (también uno de un solo nodo)
+MONGO_TRANSACTIONS = os.getenv("MONGO_TRANSACTIONS", "false").lower() == "true"
+
+
+def create_client() -> AsyncIOMotorClient:
+    """Función que construye el cliente de mongo con la configuración del pool.
+
+    El cliente no abre conexiones hasta su primer uso, por lo que crearlo al
+    importar el módulo no bloquea.
+
+    Returns:
+        AsyncIOMotorClient: Cliente de conexión a mongo
+    """
+    options: dict[str, Any] = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "event_listeners": [pool_stats, command_metrics],
+    }
+    if MONGO_COMPRESSORS: # la compresión sólo se negocia si se configura
+        options["compressors"] = MONGO_COMPRESSORS
+    return AsyncIOMotorClient(MONGO_URI, **options)
+
+
+client = create_client() # cliente de conexión a mongo
+db = client[MONGO_DB_NAME] # definición de la base de datos
+
+
+async def connect() -> None:
+    """Función que pre-calienta el pool abriendo conexiones antes de recibir tráfico."""
+    # cada ping concurrente ocupa una conexión distinta del pool
+    warm_up = max(1, MONGO_MIN_POOL_SIZE)
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(warm_up)))
+
+
+@asynccontextmanager
+async def transaction() -> AsyncIterator[Any]:
+    """Context manager que abre una transacción si están habilitadas.
+
+    Yields:
+        AsyncIOMotorClientSession | None: Sesión de la transacción, o None si las
+            transacciones están deshabilitadas y cada operación es atómica por separado
+    """
+    if not MONGO_TRANSACTIONS:
+        yield None
+        return
+
+    async with await client.start_session() as session:
+        async with session.start_transaction(): # se confirma al salir sin errores
+            yield session
+
+
+def close() -> None:
+    """Función que cierra las conexiones del cliente al apagar la aplicación."""
+    client.close()
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """Función que retorna el estado actual del pool de conexiones.
+
+    Returns:
+        dict[str, Any]: Contadores del pool y límites configurados
+    """
+    return {
+        **pool_stats.stats(),
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+    }
 
-client = AsyncIOMotorClient(MONGO_URI) # cliente de conexión a mongo
-db = client.drive_and_deal_app # definición de la base de datos
 
 # PRUEBA DE CONEXIÓN
 # Ejecuta en la terminal: python -m src.database.db
@@ -21,5 +101,4 @@ async def test_connection() -> None:
 
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(test_connection())
\ No newline at end of file
+    asyncio.run(test_connection())
@@ -0,0 +1,65 @@
+import logging # registro de eventos de la aplicación
+from typing import Any # tipado de python
+from pymongo import IndexModel # definición de índices de mongodb
+from pymongo.errors import PyMongoError # errores del driver de mongodb
+
+logger = logging.getLogger(__name__)
+
+# registro de índices declarados por cada módulo de consultas
+INDEX_REGISTRY: dict[str, list[IndexModel]] = {}
+
+
+def register_indexes(collection_name: str, *indexes: IndexModel) -> None:
+    """Función para declarar los índices que necesita una colección.
+
+    Args:
+        collection_name (str): Nombre de la colección
+        *indexes (IndexModel): Índices que se desean asegurar al iniciar la aplicación
+    """
+    INDEX_REGISTRY.setdefault(collection_name, []).extend(indexes)
+
+
+async def ensure_indexes(database: Any) -> dict[str, dict[str, list[str]]]:
+    """Función que crea los índices registrados y reporta los faltantes o sobrantes.
+
+    La creación es idempotente: mongodb ignora los índices que ya existen con la
+    misma definición.
+
+    Args:
+        database (Any): Base de datos de mongodb
+
+    Returns:
+        report (dict[str, dict[str, list[str]]]): Índices faltantes y sobrantes por colección
+    """
+    report = {} # reporte de índices por colección
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        collection = database[collection_name]
+        declared = {index.document["name"] for index in indexes}
+
+        try: # se crean los índices declarados de la colección
+            await collection.create_indexes(indexes)
+        except PyMongoError as e:
+            logger.error("No se pudieron crear los índices de %s: %s", collection_name, e)
+
+        # se comparan los índices existentes con los declarados
+        existing = set(await collection.index_information()) - {"_id_"}
+        missing = sorted(declared - existing)
+        extra = sorted(existing - declared)
+
+        if missing:
+            logger.warning("Índices faltantes en %s: %s", collection_name, ", ".join(missing))
+        if extra:
+            logger.warning("Índices no declarados en %s: %s", collection_name, ", ".join(extra))
+        report[collection_name] = {"missing": missing, "extra": extra}
+    return report
+
+
+# CREACIÓN MANUAL DE ÍNDICES
+# Ejecuta en la terminal: python -m src.database.indexes
+if __name__ == "__main__":
+    import asyncio
+    from src.database.db import db
+    import src.database.queries.cars, src.database.queries.customers # registro de índices
+    import src.database.queries.rentals, src.database.queries.repairs # registro de índices
+    import src.database.queries.users # registro de índices
+    print(asyncio.run(ensure_indexes(db)))
@@ -0,0 +1,65 @@
+from typing import Any # tipado de python
+
+
+async def migrate_repairs_registered_at(database: Any) -> int:
+    """Función que convierte a fecha de BSON el registered_at guardado como str ISO.
+
+    Es idempotente: sólo modifica los documentos que aún tienen la fecha como str.
+
+    Args:
+        database (Any): Base de datos de mongodb
+
+    Returns:
+        int: Número de reparaciones migradas
+    """
+    result = await database.repairs.update_many(
+        {"registered_at": {"$type": "string"}},
+        [{"$set": {"registered_at": {
+            "$dateFromString": {"dateString": "$registered_at", "format": "%Y-%m-%d", "timezone": "UTC"}
+        }}}]
+    )
+    return result.modified_count
+
+
+async def migrate_updated_at(database: Any) -> dict[str, int]:
+    """Función que agrega updated_at a los documentos creados antes de la sincronización.
+
+    Se usa la fecha de creación contenida en el ObjectId, por lo que es idempotente.
+
+    Args:
+        database (Any): Base de datos de mongodb
+
+    Returns:
+        dict[str, int]: Número de documentos migrados por colección
+    """
+    migrated = {} # documentos modificados por colección
+    for name in ("cars", "customers", "rentals", "repairs", "users"):
+        result = await database[name].update_many(
+            {"updated_at": {"$exists": False}},
+            [{"$set": {"updated_at": {"$toDate": "$_id"}}}]
+        )
+        migrated[f"{name}_updated_at"] = result.modified_count
+    return migrated
+
+
+async def run_migrations(database: Any) -> dict[str, int]:
+    """Función que ejecuta todas las migraciones de datos.
+
+    Args:
+        database (Any): Base de datos de mongodb
+
+    Returns:
+        dict[str, int]: Documentos modificados por cada migración
+    """
+    return {
+        "repairs_registered_at": await migrate_repairs_registered_at(database),
+        **await migrate_updated_at(database),
+    }
+
+
+# EJECUCIÓN DE MIGRACIONES
+# Ejecuta en la terminal: python -m src.database.migrations
+if __name__ == "__main__":
+    import asyncio
+    from src.database.db import db
+    print(asyncio.run(run_migrations(db)))
@@ -0,0 +1,138 @@
+from typing import Any # tipado de python
+from pymongo import monitoring # eventos del driver de mongodb
+from src.metrics import Counter, Gauge, Histogram # métricas en formato prometheus
+
+
+mongo_command_seconds = Histogram(
+    "mongo_command_duration_seconds",
+    "Duración de los comandos enviados a mongodb",
+    ("collection", "command"),
+)
+mongo_command_errors = Counter(
+    "mongo_command_errors_total",
+    "Comandos de mongodb que terminaron en error",
+    ("collection", "command"),
+)
+mongo_documents = Counter(
+    "mongo_documents_total",
+    "Documentos devueltos o afectados por los comandos de mongodb",
+    ("collection", "command"),
+)
+mongo_pool_wait_seconds = Histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Tiempo de espera para obtener una conexión del pool",
+)
+
+
+def reply_document_count(reply: dict[str, Any]) -> int:
+    """Función que obtiene el número de documentos devueltos o afectados por un comando."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict): # find, aggregate y getMore
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if isinstance(reply.get("lastErrorObject"), dict): # findAndModify
+        return reply["lastErrorObject"].get("n", 0)
+    n = reply.get("n", 0) # insert, update y delete
+    return n if isinstance(n, int) else 0
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Listener que mide la duración y los documentos de cada comando por colección."""
+
+    def __init__(self) -> None:
+        self._collections: dict[tuple[Any, int], str] = {} # colección de cada comando en curso
+
+    def started(self, event) -> None:
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        if not isinstance(collection, str): # comandos sin colección como ping
+            collection = "-"
+        self._collections[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "-")
+        mongo_command_seconds.observe(event.duration_micros / 1e6, collection, event.command_name)
+        documents = reply_document_count(event.reply)
+        if documents:
+            mongo_documents.inc(collection, event.command_name, amount=documents)
+
+    def failed(self, event) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "-")
+        mongo_command_seconds.observe(event.duration_micros / 1e6, collection, event.command_name)
+        mongo_command_errors.inc(collection, event.command_name)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Listener que lleva el conteo de conexiones del pool del cliente de mongodb."""
+
+    def __init__(self) -> None:
+        self.open = 0 # conexiones abiertas
+        self.in_use = 0 # conexiones prestadas a una operación
+        self.waiting = 0 # operaciones esperando una conexión
+        self.checkout_failed = 0 # esperas que terminaron en error (p. ej. timeout)
+        self.cleared = 0 # veces que el pool se vació por errores de red
+
+    def stats(self) -> dict[str, Any]:
+        """Método que retorna una copia de los contadores del pool."""
+        return {
+            "open": self.open,
+            "in_use": self.in_use,
+            "idle": self.open - self.in_use,
+            "waiting": self.waiting,
+            "checkout_failed": self.checkout_failed,
+            "cleared": self.cleared,
+        }
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        self.cleared += 1
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        self.open += 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self.open -= 1
+
+    def connection_check_out_started(self, event) -> None:
+        self.waiting += 1
+
+    def connection_check_out_failed(self, event) -> None:
+        self.waiting -= 1
+        self.checkout_failed += 1
+        self.observe_wait(event)
+
+    def connection_checked_out(self, event) -> None:
+        self.waiting -= 1
+        self.in_use += 1
+        self.observe_wait(event)
+
+    def observe_wait(self, event) -> None:
+        duration = getattr(event, "duration", None) # disponible desde pymongo 4.7
+        if duration is not None:
+            mongo_pool_wait_seconds.observe(duration)
+
+    def connection_checked_in(self, event) -> None:
+        self.in_use -= 1
+
+
+pool_stats = PoolStatsListener() # listener compartido por el cliente de la aplicación
+command_metrics = CommandMetricsListener() # listener de comandos del cliente de la aplicación
+
+Gauge(
+    "mongo_pool_connections",
+    "Conexiones del pool de mongodb por estado",
+    lambda: {(state,): pool_stats.stats()[state] for state in ("open", "in_use", "idle", "waiting")},
+    ("state",),
+)
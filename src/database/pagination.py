@@ -0,0 +1,143 @@
+import os # interacción con el sistema operativo
+import base64 # codificación del cursor opaco
+from typing import Any, Callable # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from bson import json_util # serialización json que conserva ObjectId y fechas
+from pymongo import ASCENDING, DESCENDING # direcciones de ordenamiento
+from src.database.mongo_serializers import serialize_doc # serializador de documentos
+
+load_dotenv() # se cargan las variables de entorno
+
+# límites de página configurables desde variables de entorno
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", 50))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", 500))
+
+
+class InvalidCursor(ValueError):
+    """Excepción lanzada cuando el cursor de paginación no es válido."""
+
+
+def encode_cursor(doc: dict[str, Any], sort_by: str) -> str:
+    """Función que genera un cursor opaco a partir del último documento de una página.
+
+    Args:
+        doc (dict[str, Any]): Último documento (sin serializar) de la página
+        sort_by (str): Campo por el que se ordena la consulta
+
+    Returns:
+        str: Cursor codificado en base64 url-safe
+    """
+    # se guarda el valor del campo de ordenamiento y el _id como desempate
+    payload = {"k": sort_by, "v": doc.get(sort_by), "id": doc["_id"]}
+    raw = json_util.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> dict[str, Any]:
+    """Función que decodifica un cursor opaco generado por encode_cursor.
+
+    Args:
+        cursor (str): Cursor recibido del cliente
+        sort_by (str): Campo por el que se ordena la consulta actual
+
+    Raises:
+        InvalidCursor: Si el cursor está mal formado o no corresponde al ordenamiento
+
+    Returns:
+        dict[str, Any]: Valor del campo de ordenamiento y _id del último documento
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4) # se restaura el relleno eliminado
+        raw = base64.urlsafe_b64decode(cursor + padding)
+        payload = json_util.loads(raw)
+    except Exception:
+        raise InvalidCursor("El cursor proporcionado no es válido.")
+
+    # el cursor sólo es válido para el mismo campo de ordenamiento
+    if not isinstance(payload, dict) or payload.get("k") != sort_by or "id" not in payload:
+        raise InvalidCursor("El cursor no corresponde al ordenamiento solicitado.")
+    return payload
+
+
+def keyset_filter(cursor: dict[str, Any], sort_by: str, descending: bool) -> dict[str, Any]:
+    """Función que construye el filtro para continuar después del último documento.
+
+    Args:
+        cursor (dict[str, Any]): Cursor decodificado
+        sort_by (str): Campo por el que se ordena la consulta
+        descending (bool): True si el ordenamiento es descendente
+
+    Returns:
+        dict[str, Any]: Filtro de mongodb para la siguiente página
+    """
+    operator = "$lt" if descending else "$gt"
+    if sort_by == "_id": # si sólo se ordena por _id basta con una comparación
+        return {"_id": {operator: cursor["id"]}}
+
+    # se usa el _id para desempatar documentos con el mismo valor
+    return {"$or": [
+        {sort_by: {operator: cursor["v"]}},
+        {sort_by: cursor["v"], "_id": {operator: cursor["id"]}},
+    ]}
+
+
+async def paginate(
+    collection: Any,
+    query: dict[str, Any],
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+    transform: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    pipeline: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Función que obtiene una página de documentos usando paginación por cursor (keyset).
+
+    Args:
+        collection (Any): Colección de mongodb a consultar
+        query (dict[str, Any]): Filtro base de la consulta
+        limit (int): Número máximo de documentos por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Campo por el que se ordena la consulta ("id" equivale a "_id")
+        descending (bool): True si el ordenamiento es descendente
+        transform (Callable | None): Función aplicada a cada documento antes de serializarlo
+        pipeline (list[dict[str, Any]] | None): Etapas de agregación aplicadas sólo a los
+            documentos de la página, p. ej. $lookup de entidades relacionadas (opcional)
+
+    Raises:
+        InvalidCursor: Si el cursor proporcionado no es válido
+
+    Returns:
+        dict[str, Any]: Documentos de la página y cursor de la siguiente página
+    """
+    limit = max(1, min(limit, MAX_PAGE_LIMIT)) # se acota el tamaño de página
+    sort_by = "_id" if sort_by == "id" else sort_by # el atributo id se mapea a _id
+    direction = DESCENDING if descending else ASCENDING
+
+    if after: # si se proporciona un cursor se continúa desde el último documento
+        cursor_data = decode_cursor(after, sort_by)
+        query = {"$and": [query, keyset_filter(cursor_data, sort_by, descending)]}
+
+    sort = [(sort_by, direction)]
+    if sort_by != "_id": # el _id se agrega como desempate del ordenamiento
+        sort.append(("_id", direction))
+
+    # se pide un documento extra para saber si existe una página siguiente
+    if pipeline: # las etapas extra se ejecutan después de limitar la página
+        cursor = collection.aggregate([
+            {"$match": query}, {"$sort": dict(sort)}, {"$limit": limit + 1}, *pipeline
+        ])
+    else:
+        cursor = collection.find(query).sort(sort).limit(limit + 1)
+    documents = await cursor.to_list(length=limit + 1)
+
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    next_cursor = encode_cursor(documents[-1], sort_by) if has_more else None
+
+    items = []
+    for document in documents: # se serializa cada documento de la página
+        if transform:
+            document = transform(document)
+        items.append(serialize_doc(document))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,211 @@
+from typing import Any, Iterable # tipado de python
+from collections import defaultdict # acumulación de incrementos por auto
+from src.database.db import db # base de datos en mongodb
+from pymongo import ASCENDING, IndexModel, ReplaceOne, UpdateOne # índices y escrituras masivas
+from src.database.indexes import register_indexes # registro de índices
+from bson import ObjectId # clase para el id de mongodb
+from src.database.pagination import DEFAULT_PAGE_LIMIT, paginate # paginación por cursor
+from src.database.changes import now # fecha de modificación
+
+
+# estadísticas acumuladas por auto; el _id es el id del auto
+car_stats = db.car_stats
+
+# contadores de cada auto y su valor inicial
+CAR_STATS_FIELDS = {"rentals": 0, "revenue": 0.0, "repairs": 0, "repair_spend": 0.0}
+
+# índices para ordenar la flotilla por sus contadores
+register_indexes(
+    "car_stats",
+    IndexModel([("rentals", ASCENDING), ("_id", ASCENDING)], name="rentals_id"),
+    IndexModel([("revenue", ASCENDING), ("_id", ASCENDING)], name="revenue_id"),
+    IndexModel([("repair_spend", ASCENDING), ("_id", ASCENDING)], name="repair_spend_id"),
+)
+
+
+def stats_update(deltas: dict[str, float], updated_at: Any) -> dict[str, Any]:
+    """Función que construye la actualización de los contadores de un auto.
+
+    Los contadores que no se incrementan se crean en cero con $setOnInsert, de modo
+    que todo documento tiene los cuatro campos y la paginación por ellos no lo omite.
+
+    Args:
+        deltas (dict[str, float]): Incremento de cada contador
+        updated_at (Any): Fecha de modificación
+
+    Returns:
+        dict[str, Any]: Actualización de mongodb
+    """
+    update = {"$inc": deltas, "$set": {"updated_at": updated_at}}
+    missing = {field: value for field, value in CAR_STATS_FIELDS.items() if field not in deltas}
+    if missing: # un campo no puede estar en $inc y en $setOnInsert a la vez
+        update["$setOnInsert"] = missing
+    return update
+
+
+def serialize_car_stats(stats: dict[str, Any]) -> dict[str, Any]:
+    """Función que completa los contadores faltantes y expone el _id como id_car.
+
+    Args:
+        stats (dict[str, Any]): Documento de estadísticas de un auto
+
+    Returns:
+        dict[str, Any]: Estadísticas del auto compatibles con el esquema CarStats
+    """
+    return {**CAR_STATS_FIELDS, **stats, "id_car": str(stats["_id"])}
+
+
+async def inc_car_stats(id_car: ObjectId, session: Any = None, **deltas: float) -> None:
+    """Función que incrementa los contadores de un auto de forma atómica.
+
+    Args:
+        id_car (ObjectId): ID del auto
+        session (Any): Sesión de la transacción en curso (opcional)
+        **deltas (float): Incremento de cada contador (p. ej. rentals=1, revenue=1500.0)
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas: # no hay cambios en los contadores
+        return
+    await car_stats.update_one(
+        {"_id": id_car},
+        stats_update(deltas, now()),
+        upsert=True, # el documento se crea con la primera renta o reparación del auto
+        session=session
+    )
+
+
+async def inc_many_car_stats(deltas: Iterable[tuple[ObjectId, dict[str, float]]]) -> None:
+    """Función que incrementa los contadores de varios autos con una sola escritura masiva.
+
+    Args:
+        deltas (Iterable[tuple[ObjectId, dict[str, float]]]): ID del auto e incremento de
+            cada contador; los incrementos del mismo auto se suman
+    """
+    totals: dict[ObjectId, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for id_car, delta in deltas:
+        for field, value in delta.items():
+            totals[id_car][field] += value
+
+    updated_at = now()
+    operations = [
+        UpdateOne({"_id": id_car}, stats_update(dict(delta), updated_at), upsert=True)
+        for id_car, delta in totals.items()
+    ]
+    if operations:
+        await car_stats.bulk_write(operations, ordered=False)
+
+
+async def delete_car_stats(id_car: ObjectId) -> None:
+    """Función que elimina las estadísticas de un auto eliminado."""
+    await car_stats.delete_one({"_id": id_car})
+
+
+async def find_car_stats(id: str) -> dict[str, Any]:
+    """Función que obtiene las estadísticas de un auto con una sola lectura por _id.
+
+    Args:
+        id (str): ID del auto
+
+    Returns:
+        dict[str, Any]: Rentas, ingresos, reparaciones y gasto del auto o None si el auto no existe
+    """
+    stats = await car_stats.find_one({"_id": ObjectId(id)}, {"updated_at": 0})
+    if stats is None: # un auto sin rentas ni reparaciones aún no tiene documento
+        if await db.cars.find_one({"_id": ObjectId(id)}, {"_id": 1}) is None:
+            return None
+        stats = {"_id": ObjectId(id)}
+    return serialize_car_stats(stats)
+
+
+async def find_fleet_stats(
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+) -> dict[str, Any]:
+    """Función para obtener una página de estadísticas de los autos con rentas o reparaciones.
+
+    Args:
+        limit (int): Número máximo de autos por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Contador por el que se ordenan los autos
+        descending (bool): True si el ordenamiento es descendente
+
+    Returns:
+        dict[str, Any]: Página de estadísticas y cursor de la siguiente página
+    """
+    page = await paginate(car_stats, {}, limit, after, sort_by, descending)
+    # paginate expone el _id como id; en las estadísticas corresponde al auto
+    page["items"] = [
+        {**CAR_STATS_FIELDS, **item, "id_car": item.pop("id")} for item in page["items"]
+    ]
+    return page
+
+
+def stats_pipeline(match: dict[str, Any]) -> list[dict[str, Any]]:
+    """Función que construye la agregación de los contadores por auto.
+
+    Recorre las rentas y, con $unionWith, las reparaciones en una sola consulta.
+
+    Args:
+        match (dict[str, Any]): Filtro de las rentas y reparaciones a considerar
+
+    Returns:
+        list[dict[str, Any]]: Etapas de la agregación
+    """
+    return [
+        {"$match": match},
+        {"$project": {"id_car": 1, "rentals": {"$literal": 1}, "revenue": "$total_amount"}},
+        {"$unionWith": {"coll": "repairs", "pipeline": [
+            {"$match": match},
+            {"$project": {"id_car": 1, "repairs": {"$literal": 1}, "repair_spend": "$mount"}},
+        ]}},
+        {"$group": {"_id": "$id_car", **{field: {"$sum": f"${field}"} for field in CAR_STATS_FIELDS}}},
+    ]
+
+
+async def rebuild_car_stats(database: Any = db, ids: list[ObjectId] | None = None) -> int:
+    """Función que recalcula las estadísticas de los autos desde las rentas y reparaciones.
+
+    Corrige cualquier diferencia acumulada en los contadores. Sin ids se recalcula
+    toda la flotilla en el servidor, en una colección temporal que reemplaza a la
+    actual; los incrementos hechos mientras tanto pueden perderse, por lo que
+    conviene ejecutarlo con poca escritura. Con ids sólo se recalculan esos autos.
+
+    Args:
+        database (Any): Base de datos de mongodb
+        ids (list[ObjectId] | None): IDs de los autos a recalcular (opcional)
+
+    Returns:
+        int: Número de autos recalculados
+    """
+    updated_at = now()
+
+    if ids is not None: # recálculo de pocos autos con sus índices por id_car
+        stats = {id_car: {**CAR_STATS_FIELDS, "updated_at": updated_at} for id_car in ids}
+        async for document in database.rentals.aggregate(stats_pipeline({"id_car": {"$in": ids}})):
+            stats[document.pop("_id")].update(document)
+        operations = [ReplaceOne({"_id": id_car}, document, upsert=True) for id_car, document in stats.items()]
+        if operations:
+            await database.car_stats.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    # recálculo completo en el servidor sin traer documentos a la aplicación
+    await database.rentals.aggregate([
+        *stats_pipeline({}), {"$set": {"updated_at": updated_at}}, {"$out": "car_stats_rebuild"},
+    ]).to_list(length=None)
+
+    # se reemplaza la colección actual conservando sus índices
+    rebuilt = database.car_stats_rebuild
+    for index in await database.car_stats.list_indexes().to_list(length=None):
+        if index["name"] != "_id_":
+            await rebuilt.create_index(list(index["key"].items()), name=index["name"])
+    await rebuilt.rename("car_stats", dropTarget=True)
+    return await database.car_stats.count_documents({})
+
+
+# RECÁLCULO DE ESTADÍSTICAS
+# Ejecuta en la terminal: python -m src.database.queries.car_stats
+if __name__ == "__main__":
+    import asyncio
+    print(f"Estadísticas recalculadas de {asyncio.run(rebuild_car_stats(db))} autos")
@@ -1,11 +1,43 @@
-from typing import Any # tipado de python
+import os # interacción con el sistema operativo
+from typing import Any, AsyncIterator # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from src.cache import ResponseCache # caché de resultados de consultas
 from src.database.db import db # base de datos en mongodb
+from pymongo import ASCENDING, IndexModel # definición de índices
+from src.database.indexes import register_indexes # registro de índices
 from bson import ObjectId # clase para el id de mongodb 
-from src.database.mongo_serializers import serialize_doc, serialize_docs
+from pymongo import ReturnDocument # opción para obtener el documento actualizado
+from src.database.mongo_serializers import serialize_doc
+from src.database.pagination import DEFAULT_PAGE_LIMIT, paginate # paginación por cursor
+from src.database.streaming import iter_documents # recorrido por streaming
+from src.database.versioning import bump_collection_version, get_collection_version # versión de las colecciones
+from src.database.coalescing import coalesce, writes # agrupación de lecturas concurrentes
+from src.database.bulk import bulk_insert, bulk_update # escrituras masivas
+from src.database.changes import find_changes, now, record_deletion # sincronización incremental
+from src.database.queries.car_stats import delete_car_stats # estadísticas por auto
+
+load_dotenv() # se cargan las variables de entorno
 
 
 cars = db.cars # colección para almacenar autos
 
+# índices para búsquedas por placa y por disponibilidad
+register_indexes(
+    "cars",
+    IndexModel([("license_plate", ASCENDING)], name="license_plate"),
+    IndexModel([("avaible", ASCENDING)], name="avaible"),
+    IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_id"),
+)
+
+# caché de los listados de autos, se invalida con cada escritura de autos o rentas
+# su generación es la versión compartida de la colección de autos
+cars_cache = ResponseCache(
+    "cars",
+    ttl=float(os.getenv("CARS_CACHE_TTL_SECONDS", 30)),
+    version=lambda: get_collection_version("cars"),
+    bump=lambda: bump_collection_version("cars"),
+)
+
 
 async def find_car(id: str) -> dict[str, Any]:
     """Función que busca por id un auto en la base de datos.
@@ -23,31 +55,88 @@ async def find_car(id: str) -> dict[str, Any]:
     return serialize_doc(car) if car else None
 
 
-async def find_cars() -> list[dict[str, Any]]:
-    """Función para obtener todos los autos de la base de datos.
+async def cars_changed() -> None:
+    """Función que registra un cambio en los autos: nueva versión e invalidación de la caché."""
+    await cars_cache.invalidate() # incrementa la versión de la colección
+
+
+async def find_cars_version() -> int:
+    """Función que obtiene la versión de la colección de autos.
+
+    Se lee siempre de mongodb (una búsqueda por _id) para que todos los procesos
+    compartan la misma versión y ningún ETag anterior a una escritura siga vigente.
 
     Returns:
-        cars_list (list[dict[str, Any]]): Lista de autos en la base de datos
+        int: Versión de la colección de autos
     """
-    cars_list = [] # se crea una lista vacía para almacenar autos
-    cursor = cars.find({}) # se hace la búsqueda en la base de datos
+    return await get_collection_version("cars")
+
+
+@coalesce("cars")
+async def find_cars(
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+) -> dict[str, Any]:
+    """Función para obtener una página de autos de la base de datos.
+
+    Args:
+        limit (int): Número máximo de autos por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Campo por el que se ordenan los autos
+        descending (bool): True si el ordenamiento es descendente
+
+    Returns:
+        dict[str, Any]: Página de autos y cursor de la siguiente página
+    """
+    # se obtiene sólo la página solicitada, desde la caché si está disponible
+    return await cars_cache.get_or_load(
+        ("find_cars", limit, after, sort_by, descending),
+        lambda: paginate(cars, {}, limit, after, sort_by, descending)
+    )
+
+
+def iter_cars() -> AsyncIterator[dict[str, Any]]:
+    """Función para recorrer todos los autos de la base de datos sin cargarlos en memoria.
+
+    Returns:
+        AsyncIterator[dict[str, Any]]: Generador de autos serializados
+    """
+    return iter_documents(cars)
+
+async def find_cars_changes(since: str | None = None, limit: int = DEFAULT_PAGE_LIMIT) -> dict[str, Any]:
+    """Función para obtener los autos modificados y eliminados desde un token de sincronización.
+
+    Args:
+        since (str | None): Token de la consulta anterior (None para la carga inicial)
+        limit (int): Número máximo de autos modificados por respuesta
 
-    # se recorre de manera asíncrona el cursor con los autos
-    async for document in cursor:
-        cars_list.append(document) # se agregan los autos a la lista
-    return serialize_docs(cars_list) # se retorna la lista con las autos ya serializadas
+    Returns:
+        dict[str, Any]: Autos modificados, ids eliminados y siguiente token
+    """
+    return await find_changes(cars, since, limit)
 
 
+@coalesce("cars")
 async def find_cars_by_filters(
     is_avaible: bool | None = None, 
-) -> list[dict[str, Any]]:
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+) -> dict[str, Any]:
     """Función para obtener los autos que estén disponibles o no.
     
     Args:
         is_avaible (bool | None): bool que indica si el auto está disponible (opcional)
+        limit (int): Número máximo de autos por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Campo por el que se ordenan los autos
+        descending (bool): True si el ordenamiento es descendente
         
     Returns:
-        list[dict[str, Any]]: Lista de autos que coinciden con los filtros
+        dict[str, Any]: Página de autos que coinciden con los filtros
     """
     query = {} # diccionario para almacenar queries
     
@@ -55,14 +144,14 @@ async def find_cars_by_filters(
     #     query["registered_at"] = is_avaible
 
     query["avaible"] = is_avaible
-    repairs_list = [] # lista para almacenar las reparaciones
-    cursor = cars.find(query) # se ejecuta el query a la base de datos
-    
-    async for document in cursor: # se recorre el cursor con los documentos filtrados
-        repairs_list.append(document) # se agrega el documento a la lista
-    return serialize_docs(repairs_list) # se serializa la lista de documentos su ID a str
+    # se ejecuta el query paginado a la base de datos, desde la caché si está disponible
+    return await cars_cache.get_or_load(
+        ("find_cars_by_filters", is_avaible, limit, after, sort_by, descending),
+        lambda: paginate(cars, query, limit, after, sort_by, descending)
+    )
 
 
+@writes("cars")
 async def insert_car(car_data: dict[str, Any]) -> dict[str, Any]:
     """Función para insertar un auto en la base de datos.
     
@@ -72,14 +161,54 @@ async def insert_car(car_data: dict[str, Any]) -> dict[str, Any]:
     Returns:
         created_car (dict[str, Any]): Auto creado
     """
+    car_data["updated_at"] = now() # fecha de modificación para la sincronización
+
     # se inserta la nueva tarea en la base de datos
     new_car = await cars.insert_one(car_data)
+    await cars_changed() # los listados de autos ya no son vigentes
 
-    # si la inserción fue éxitosa se busca la tarea
-    created_car = await cars.find_one({"_id": new_car.inserted_id})
+    # se construye el auto creado localmente a partir del id insertado
+    created_car = {**car_data, "_id": new_car.inserted_id}
     return serialize_doc(created_car) # se retorna ya serializada
 
 
+@writes("cars")
+async def insert_many_cars(cars_data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Función para insertar autos de forma masiva en la base de datos.
+
+    Args:
+        cars_data (list[dict[str, Any]]): Datos de los autos que se desean insertar
+
+    Returns:
+        list[dict[str, Any]]: Resultado de la inserción de cada auto
+    """
+    def prepare(car: dict[str, Any]) -> dict[str, Any]:
+        car["updated_at"] = now() # fecha de modificación para la sincronización
+        return car
+
+    results = await bulk_insert(cars, cars_data, prepare)
+    if any(result["status"] == "created" for result in results):
+        await cars_changed() # se invalida una sola vez por petición
+    return results
+
+
+@writes("cars")
+async def update_many_cars(updates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Función para actualizar autos de forma masiva en la base de datos.
+
+    Args:
+        updates (list[dict[str, Any]]): ID y datos de cada auto que se desea actualizar
+
+    Returns:
+        list[dict[str, Any]]: Resultado de la actualización de cada auto
+    """
+    results = await bulk_update(cars, updates)
+    if any(result["status"] == "updated" for result in results):
+        await cars_changed() # se invalida una sola vez por petición
+    return results
+
+
+@writes("cars")
 async def update_one_car(id: str, car_data: dict[str, Any]) -> dict[str, Any]:
     """Función para actualizar una tarea en la base de datos.
 
@@ -92,17 +221,21 @@ async def update_one_car(id: str, car_data: dict[str, Any]) -> dict[str, Any]:
     """
     # se obtienen sólo los datos proporcionados para actualizar el auto
     car = {k: v for k, v in car_data.items() if v is not None}
+    car["updated_at"] = now() # fecha de modificación para la sincronización
 
     # se actualiza el auto en la base de datos con la información dada
-    result = await cars.update_one({"_id": ObjectId(id)}, {"$set": car})
-    if result.matched_count == 0: # si no se logra la actualización
+    # y se obtiene el auto actualizado en la misma operación
+    updated_car = await cars.find_one_and_update(
+        {"_id": ObjectId(id)}, {"$set": car}, return_document=ReturnDocument.AFTER
+    )
+    if updated_car is None: # si no se logra la actualización
         return None # se retorna None
-    
-    # si la actualización fue éxitosa se busca el auto actualizado
-    updated_car = await cars.find_one({"_id": ObjectId(id)})
+
+    await cars_changed() # los listados de autos ya no son vigentes
     return serialize_doc(updated_car) # se retorna ya serializado
 
 
+@writes("cars")
 async def delete_one_car(id: str) -> bool:
     """Función para eliminar un auto en la base de datos.
 
@@ -114,4 +247,8 @@ async def delete_one_car(id: str) -> bool:
     """
     # se realiza la eliminación del auto de la base de datos    
     result = await cars.delete_one({"_id": ObjectId(id)})
+    if result.deleted_count == 1: # los listados de autos ya no son vigentes
+        await delete_car_stats(ObjectId(id))
+        await record_deletion("cars", ObjectId(id))
+        await cars_changed()
     return result.deleted_count == 1 # si se elimina el auto se retorna True de lo contrario False
\ No newline at end of file
@@ -1,11 +1,26 @@
-from typing import Any # tipado de python
+from typing import Any, AsyncIterator # tipado de python
 from src.database.db import db # base de datos en mongodb
 from bson import ObjectId # clase para el id de mongodb 
-from src.database.mongo_serializers import serialize_doc, serialize_docs # serializadores
+from pymongo import ReturnDocument # opción para obtener el documento actualizado
+from src.database.mongo_serializers import serialize_doc # serializadores
+from src.database.pagination import DEFAULT_PAGE_LIMIT, paginate # paginación por cursor
+from src.database.streaming import iter_documents # recorrido por streaming
+from src.database.versioning import bump_collection_version # versión de las colecciones
+from src.database.coalescing import coalesce, writes # agrupación de lecturas concurrentes
+from src.database.bulk import bulk_insert, bulk_update # escrituras masivas
+from src.database.changes import find_changes, now, record_deletion # sincronización incremental
+from pymongo import ASCENDING, IndexModel # definición de índices
+from src.database.indexes import register_indexes # registro de índices
 
 
 customers = db.customers # colección para almacenar clientes
 
+# índice para la sincronización incremental de clientes
+register_indexes(
+    "customers",
+    IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_id"),
+)
+
 
 async def find_customer(id: str) -> dict[str, Any]:
     """Función que busca por id un cliente en la base de datos.
@@ -23,21 +38,50 @@ async def find_customer(id: str) -> dict[str, Any]:
     return serialize_doc(customer) if customer else None
 
 
-async def find_customers() -> list[dict[str, Any]]:
-    """Función para obtener todos los clientes de la base de datos.
+@coalesce("customers")
+async def find_customers(
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+) -> dict[str, Any]:
+    """Función para obtener una página de clientes de la base de datos.
+
+    Args:
+        limit (int): Número máximo de clientes por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Campo por el que se ordenan los clientes
+        descending (bool): True si el ordenamiento es descendente
+
+    Returns:
+        dict[str, Any]: Página de clientes y cursor de la siguiente página
+    """
+    # se obtiene sólo la página solicitada en lugar de toda la colección
+    return await paginate(customers, {}, limit, after, sort_by, descending)
+
+
+def iter_customers() -> AsyncIterator[dict[str, Any]]:
+    """Función para recorrer todos los clientes de la base de datos sin cargarlos en memoria.
 
     Returns:
-        customers_list (list[dict[str, Any]]): Lista de clientes en la base de datos
+        AsyncIterator[dict[str, Any]]: Generador de clientes serializados
     """
-    customers_list = [] # se crea una lista vacía para almacenar clientes
-    cursor = customers.find({}) # se hace la búsqueda en la base de datos
+    return iter_documents(customers)
 
-    # se recorre de manera asíncrona el cursor con los clientes
-    async for document in cursor:
-        customers_list.append(document) # se agregan los clientes a la lista
-    return serialize_docs(customers_list) # se retorna la lista con las clientes ya serializadas
+async def find_customers_changes(since: str | None = None, limit: int = DEFAULT_PAGE_LIMIT) -> dict[str, Any]:
+    """Función para obtener los clientes modificados y eliminados desde un token de sincronización.
 
+    Args:
+        since (str | None): Token de la consulta anterior (None para la carga inicial)
+        limit (int): Número máximo de clientes modificados por respuesta
+
+    Returns:
+        dict[str, Any]: Clientes modificados, ids eliminados y siguiente token
+    """
+    return await find_changes(customers, since, limit)
 
+
+@writes("customers")
 async def insert_customer(customer_data: dict[str, Any]) -> dict[str, Any]:
     """Función para insertar un cliente en la base de datos.
     
@@ -47,14 +91,55 @@ async def insert_customer(customer_data: dict[str, Any]) -> dict[str, Any]:
     Returns:
         created_customer (dict[str, Any]): cliente creado
     """
+    customer_data["updated_at"] = now() # fecha de modificación para la sincronización
+
     # se inserta la nueva tarea en la base de datos
     new_customer = await customers.insert_one(customer_data)
 
-    # si la inserción fue éxitosa se busca la tarea
-    created_customer = await customers.find_one({"_id": new_customer.inserted_id})
+    await bump_collection_version("customers")
+
+    # se construye el cliente creado localmente a partir del id insertado
+    created_customer = {**customer_data, "_id": new_customer.inserted_id}
     return serialize_doc(created_customer) # se retorna ya serializada
 
 
+@writes("customers")
+async def insert_many_customers(customers_data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Función para insertar clientes de forma masiva en la base de datos.
+
+    Args:
+        customers_data (list[dict[str, Any]]): Datos de los clientes que se desean insertar
+
+    Returns:
+        list[dict[str, Any]]: Resultado de la inserción de cada cliente
+    """
+    def prepare(customer: dict[str, Any]) -> dict[str, Any]:
+        customer["updated_at"] = now() # fecha de modificación para la sincronización
+        return customer
+
+    results = await bulk_insert(customers, customers_data, prepare)
+    if any(result["status"] == "created" for result in results):
+        await bump_collection_version("customers")
+    return results
+
+
+@writes("customers")
+async def update_many_customers(updates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Función para actualizar clientes de forma masiva en la base de datos.
+
+    Args:
+        updates (list[dict[str, Any]]): ID y datos de cada cliente que se desea actualizar
+
+    Returns:
+        list[dict[str, Any]]: Resultado de la actualización de cada cliente
+    """
+    results = await bulk_update(customers, updates)
+    if any(result["status"] == "updated" for result in results):
+        await bump_collection_version("customers")
+    return results
+
+
+@writes("customers")
 async def update_one_customer(id: str, customer_data: dict[str, Any]) -> dict[str, Any]:
     """Función para actualizar una tarea en la base de datos.
 
@@ -67,17 +152,21 @@ async def update_one_customer(id: str, customer_data: dict[str, Any]) -> dict[st
     """
     # se obtienen sólo los datos proporcionados para actualizar el cliente
     customer = {k: v for k, v in customer_data.items() if v is not None}
+    customer["updated_at"] = now() # fecha de modificación para la sincronización
 
     # se actualiza el cliente en la base de datos con la información dada
-    result = await customers.update_one({"_id": ObjectId(id)}, {"$set": customer})
-    if result.matched_count == 0: # si no se logra la actualización
+    # y se obtiene el cliente actualizado en la misma operación
+    updated_customer = await customers.find_one_and_update(
+        {"_id": ObjectId(id)}, {"$set": customer}, return_document=ReturnDocument.AFTER
+    )
+    if updated_customer is None: # si no se logra la actualización
         return None # se retorna None
-    
-    # si la actualización fue éxitosa se busca el cliente actualizado
-    updated_customer = await customers.find_one({"_id": ObjectId(id)})
+
+    await bump_collection_version("customers")
     return serialize_doc(updated_customer) # se retorna ya serializado
 
 
+@writes("customers")
 async def delete_one_customer(id: str) -> bool:
     """Función para eliminar un cliente en la base de datos.
 
@@ -89,4 +178,7 @@ async def delete_one_customer(id: str) -> bool:
     """
     # se realiza la eliminación del cliente de la base de datos    
     result = await customers.delete_one({"_id": ObjectId(id)})
+    if result.deleted_count == 1:
+        await record_deletion("customers", ObjectId(id))
+        await bump_collection_version("customers")
     return result.deleted_count == 1 # si se elimina el cliente se retorna True de lo contrario False
\ No newline at end of file
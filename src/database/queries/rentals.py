@@ -1,22 +1,109 @@
-from datetime import datetime, timezone
-from typing import Any # tipado de python
-from src.database.db import db # base de datos en mongodb
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator # tipado de python
+from src.database.db import db, transaction # base de datos en mongodb
+from pymongo import ASCENDING, IndexModel # definición de índices
+from src.database.indexes import register_indexes # registro de índices
 from bson import ObjectId # clase para el id de mongodb 
-from src.database.mongo_serializers import serialize_doc, serialize_docs # serializadores
+from pymongo import ReturnDocument # opción para obtener el documento actualizado
+from src.database.mongo_serializers import serialize_doc # serializadores
+from src.database.pagination import DEFAULT_PAGE_LIMIT, paginate # paginación por cursor
+from src.database.streaming import iter_documents # recorrido por streaming
+from src.database.queries.cars import cars, cars_changed # colección de autos
+from src.database.versioning import bump_collection_version # versión de las colecciones
+from src.database.coalescing import coalesce, writes # agrupación de lecturas concurrentes
+from src.database.changes import find_changes, now, record_deletion # sincronización incremental
+from src.database.queries.car_stats import inc_car_stats # estadísticas por auto
 
 
 rentals = db.rentals # colección para almacenar rentas
 
+# índices para rentas por auto, por cliente y por periodo
+register_indexes(
+    "rentals",
+    IndexModel([("id_car", ASCENDING), ("start_date", ASCENDING)], name="id_car_start_date"),
+    IndexModel([("id_customer", ASCENDING)], name="id_customer"),
+    IndexModel([("start_date", ASCENDING)], name="start_date"),
+    IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_id"),
+)
 
-async def find_rental(id: str) -> dict[str, Any]:
+
+# entidades relacionadas que se pueden incluir en una renta: colección y referencia
+RENTAL_EXPANSIONS = {
+    "customer": ("customers", "id_customer"),
+    "car": ("cars", "id_car"),
+}
+
+
+class CarNotAvailable(Exception):
+    """Excepción lanzada cuando el auto de una renta no existe o ya está rentado."""
+
+
+def serialize_rental_refs(rental: dict[str, Any]) -> dict[str, Any]:
+    """Función que convierte a str los ObjectId del cliente y del auto de una renta.
+
+    Args:
+        rental (dict[str, Any]): Documento de la renta
+
+    Returns:
+        rental (dict[str, Any]): Documento con las referencias como str
+    """
+    rental["id_customer"] = str(rental["id_customer"])
+    rental["id_car"] = str(rental["id_car"])
+    return rental
+
+
+def expand_pipeline(expand: tuple[str, ...]) -> list[dict[str, Any]]:
+    """Función que construye las etapas $lookup para incluir las entidades relacionadas.
+
+    Args:
+        expand (tuple[str, ...]): Entidades a incluir ("customer" y/o "car")
+
+    Returns:
+        list[dict[str, Any]]: Etapas de agregación
+    """
+    pipeline = [] # etapas de agregación
+    for name in expand:
+        collection, field = RENTAL_EXPANSIONS[name]
+        pipeline += [
+            {"$lookup": {"from": collection, "localField": field, "foreignField": "_id", "as": name}},
+            # la entidad se incluye como objeto, o null si ya no existe
+            {"$unwind": {"path": f"${name}", "preserveNullAndEmptyArrays": True}},
+        ]
+    if expand: # no se envían los campos internos de las entidades
+        pipeline.append({"$project": {f"{name}.updated_at": 0 for name in expand}})
+    return pipeline
+
+
+def serialize_rental_detail(rental: dict[str, Any]) -> dict[str, Any]:
+    """Función que serializa las referencias y las entidades incluidas de una renta.
+
+    Args:
+        rental (dict[str, Any]): Documento de la renta con las entidades de $lookup
+
+    Returns:
+        rental (dict[str, Any]): Documento con las referencias y entidades serializadas
+    """
+    for name in RENTAL_EXPANSIONS:
+        if rental.get(name):
+            rental[name] = serialize_doc(rental[name])
+    return serialize_rental_refs(rental)
+
+
+async def find_rental(id: str, expand: tuple[str, ...] = ()) -> dict[str, Any]:
     """Función que busca por id una renta en la base de datos.
 
     Args:
         id (str): ID del renta
+        expand (tuple[str, ...]): Entidades relacionadas a incluir (opcional)
 
     Returns:
         rental (dict[str, Any]) : renta en la base de datos
     """
+    if expand: # se incluyen las entidades relacionadas en el mismo viaje
+        pipeline = [{"$match": {"_id": ObjectId(id)}}, *expand_pipeline(expand)]
+        documents = await rentals.aggregate(pipeline).to_list(length=1)
+        return serialize_doc(serialize_rental_detail(documents[0])) if documents else None
+
     # se hace una búsqueda del renta en la base de datos
     rental = await rentals.find_one({"_id": ObjectId(id)})
     
@@ -29,48 +116,168 @@ async def find_rental(id: str) -> dict[str, Any]:
     return None
 
 
-async def find_rentals() -> list[dict[str, Any]]:
-    """Función para obtener todos los rentas de la base de datos.
+@coalesce("rentals", "customers", "cars")
+async def find_rentals(
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+    expand: tuple[str, ...] = (),
+) -> dict[str, Any]:
+    """Función para obtener una página de rentas de la base de datos.
+
+    Args:
+        limit (int): Número máximo de rentas por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Campo por el que se ordenan las rentas
+        descending (bool): True si el ordenamiento es descendente
+        expand (tuple[str, ...]): Entidades relacionadas a incluir (opcional)
 
     Returns:
-        rentals_list (list[dict[str, Any]]): Lista de rentas en la base de datos
+        dict[str, Any]: Página de rentas y cursor de la siguiente página
     """
-    rentals_list = [] # se crea una lista vacía para almacenar rentas
-    cursor = rentals.find({}) # se hace la búsqueda en la base de datos
+    if expand: # las entidades se buscan sólo para las rentas de la página
+        return await paginate(
+            rentals, {}, limit, after, sort_by, descending,
+            transform=serialize_rental_detail, pipeline=expand_pipeline(expand)
+        )
+
+    # se obtiene sólo la página solicitada con las referencias serializadas
+    return await paginate(
+        rentals, {}, limit, after, sort_by, descending, transform=serialize_rental_refs
+    )
 
-    # se recorre de manera asíncrona el cursor con los rentas
-    async for document in cursor:
-        document["id_customer"] = str(document["id_customer"])
-        document["id_car"] = str(document["id_car"])
-        rentals_list.append(document) # se agregan los rentas a la lista
-    return serialize_docs(rentals_list) # se retorna la lista con las rentas ya serializadas
 
+def iter_rentals() -> AsyncIterator[dict[str, Any]]:
+    """Función para recorrer todas las rentas de la base de datos sin cargarlos en memoria.
 
+    Returns:
+        AsyncIterator[dict[str, Any]]: Generador de rentas serializados
+    """
+    return iter_documents(rentals, transform=serialize_rental_refs)
+
+async def find_rentals_changes(since: str | None = None, limit: int = DEFAULT_PAGE_LIMIT) -> dict[str, Any]:
+    """Función para obtener las rentas modificadas y eliminadas desde un token de sincronización.
+
+    Args:
+        since (str | None): Token de la consulta anterior (None para la carga inicial)
+        limit (int): Número máximo de rentas modificadas por respuesta
+
+    Returns:
+        dict[str, Any]: Rentas modificadas, ids eliminados y siguiente token
+    """
+    return await find_changes(rentals, since, limit, transform=serialize_rental_refs)
+
+
+@coalesce("rentals", "cars")
+async def find_most_rented_cars(
+    days: int = 60,
+    top: int = 10,
+    include_car: bool = False,
+) -> list[dict[str, Any]]:
+    """Función que obtiene los autos más rentados en un periodo mediante una agregación.
+
+    Args:
+        days (int): Número de días hacia atrás que abarca el periodo
+        top (int): Número máximo de autos en el ranking
+        include_car (bool): True para incluir la marca y modelo de cada auto
+
+    Returns:
+        ranking (list[dict[str, Any]]): Autos ordenados por número de rentas
+    """
+    # se calcula la fecha de inicio del periodo en formato y horario UTC
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+
+    # se filtra, agrupa y ordena en mongodb para que sólo viaje el ranking
+    pipeline = [
+        {"$match": {"start_date": {"$gte": since}}},
+        {"$group": {"_id": "$id_car", "rentals": {"$sum": 1}}},
+        {"$sort": {"rentals": -1, "_id": 1}},
+        {"$limit": top},
+    ]
+
+    if include_car: # si se solicita se agregan los datos del auto
+        pipeline += [
+            {"$lookup": {
+                "from": "cars",
+                "localField": "_id",
+                "foreignField": "_id",
+                "as": "car",
+            }},
+            {"$unwind": {"path": "$car", "preserveNullAndEmptyArrays": True}},
+            {"$project": {"rentals": 1, "brand": "$car.brand", "model": "$car.model"}},
+        ]
+
+    ranking = [] # lista para almacenar el ranking
+    async for document in rentals.aggregate(pipeline):
+        ranking.append({
+            "id_car": str(document["_id"]),
+            "rentals": document["rentals"],
+            "brand": document.get("brand"),
+            "model": document.get("model"),
+        })
+    return ranking
+
+
+@writes("rentals", "cars")
 async def insert_rental(rental_data: dict[str, Any]) -> dict[str, Any]:
     """Función para insertar una renta de renta en la base de datos.
     
     Args:
         rental_data (dict[str, Any]): Datos del renta que se desea insertar
 
+    Raises:
+        CarNotAvailable: Si el auto no existe o no está disponible
+
     Returns:
         created_rental (dict[str, Any]): renta creado
     """
-    # se establece la fecha de inicio de la renta en formato y horario UTC
-    rental_data["start_date"] = datetime.now(timezone.utc)
+    # se establece la fecha de inicio de la renta en horario UTC con la precisión
+    # de milisegundos de BSON, para que la renta construida localmente coincida con la guardada
+    rental_data["start_date"] = now()
+    rental_data["updated_at"] = rental_data["start_date"] # fecha de modificación para la sincronización
 
     rental_data["id_customer"] = ObjectId(rental_data["id_customer"])
     rental_data["id_car"] = ObjectId(rental_data["id_car"])
 
-    # se inserta la nueva renta en la base de datos
-    new_rental = await rentals.insert_one(rental_data)
+    car = None # auto apartado para la renta
+    try:
+        async with transaction() as session:
+            # se aparta el auto sólo si sigue disponible, de forma atómica
+            car = await cars.find_one_and_update(
+                {"_id": rental_data["id_car"], "avaible": True},
+                {"$set": {"avaible": False, "updated_at": rental_data["updated_at"]}},
+                session=session
+            )
+            if car is None: # el auto no existe o ya fue rentado
+                raise CarNotAvailable("El auto no existe o no está disponible.")
+
+            try: # se inserta la nueva renta en la base de datos
+                new_rental = await rentals.insert_one(rental_data, session=session)
+            except Exception:
+                if session is None: # sin transacción se libera el auto manualmente
+                    await cars.update_one({"_id": rental_data["id_car"]}, {"$set": {"avaible": True, "updated_at": now()}})
+                raise
 
-    # si la inserción fue éxitosa se busca la renta
-    created_rental = await rentals.find_one({"_id": new_rental.inserted_id})
-    created_rental["id_customer"] = str(created_rental["id_customer"])
-    created_rental["id_car"] = str(created_rental["id_car"])
-    return serialize_doc(created_rental) # se retorna ya serializada
+            # la renta se suma a las estadísticas del auto
+            await inc_car_stats(rental_data["id_car"], session, rentals=1, revenue=rental_data["total_amount"])
+    finally:
+        if car is not None: # la disponibilidad del auto cambió
+            await cars_changed()
 
+    await bump_collection_version("rentals")
 
+    # se construye la renta creada localmente a partir del id insertado; mongodb
+    # retorna las fechas en UTC sin zona horaria, por lo que se retira de la copia local
+    created_rental = {
+        **rental_data,
+        "_id": new_rental.inserted_id,
+        "start_date": rental_data["start_date"].replace(tzinfo=None),
+    }
+    return serialize_doc(serialize_rental_refs(created_rental)) # se retorna ya serializada
+
+
+@writes("rentals", "cars")
 async def update_one_rental(id: str, rental_data: dict[str, Any]) -> dict[str, Any]:
     """Función para actualizar una renta en la base de datos.
 
@@ -83,19 +290,44 @@ async def update_one_rental(id: str, rental_data: dict[str, Any]) -> dict[str, A
     """
     # se obtienen sólo los datos proporcionados para actualizar el renta
     rental = {k: v for k, v in rental_data.items() if v is not None}
+    rental["updated_at"] = now() # fecha de modificación para la sincronización
 
-    # se actualiza el renta en la base de datos con la información dada
-    result = await rentals.update_one({"_id": ObjectId(id)}, {"$set": rental})
-    if result.matched_count == 0: # si no se logra la actualización
-        return None # se retorna None
-    
-    # si la actualización fue éxitosa se busca el renta actualizado
-    updated_rental = await rentals.find_one({"_id": ObjectId(id)})
-    updated_rental["id_customer"] = str(updated_rental["id_customer"])
-    updated_rental["id_car"] = str(updated_rental["id_car"])
-    return serialize_doc(updated_rental) # se retorna ya serializado
+    async with transaction() as session:
+        # se actualiza la renta y se obtiene su estado previo en la misma operación
+        previous_rental = await rentals.find_one_and_update(
+            {"_id": ObjectId(id)},
+            {"$set": rental},
+            return_document=ReturnDocument.BEFORE,
+            session=session
+        )
+        if previous_rental is None: # si no se logra la actualización
+            return None # se retorna None
+
+        # si la renta se marca como devuelta por primera vez se libera el auto
+        released = bool(rental.get("returned") and not previous_rental.get("returned"))
+        if released:
+            await cars.update_one(
+                {"_id": previous_rental["id_car"]},
+                {"$set": {"avaible": True, "updated_at": rental["updated_at"]}},
+                session=session
+            )
+
+        if "total_amount" in rental: # se ajustan los ingresos del auto con la diferencia
+            await inc_car_stats(
+                previous_rental["id_car"], session,
+                revenue=rental["total_amount"] - previous_rental.get("total_amount", 0)
+            )
+
+    await bump_collection_version("rentals")
+    if released: # la disponibilidad del auto cambió
+        await cars_changed()
+
+    # se construye la renta actualizada localmente a partir de su estado previo
+    updated_rental = {**previous_rental, **rental}
+    return serialize_doc(serialize_rental_refs(updated_rental)) # se retorna ya serializado
 
 
+@writes("rentals")
 async def delete_one_rental(id: str) -> bool:
     """Función para eliminar una renta de renta en la base de datos.
 
@@ -105,6 +337,14 @@ async def delete_one_rental(id: str) -> bool:
     Returns
         bool: True si la eliminación fue éxitosa
     """
-    # se realiza la eliminación del renta de la base de datos    
-    result = await rentals.delete_one({"_id": ObjectId(id)})
-    return result.deleted_count == 1 # si se elimina el renta se retorna True de lo contrario False
\ No newline at end of file
+    # se realiza la eliminación del renta de la base de datos
+    deleted_rental = await rentals.find_one_and_delete(
+        {"_id": ObjectId(id)}, projection={"id_car": 1, "total_amount": 1}
+    )
+    if deleted_rental is not None: # la renta se resta de las estadísticas del auto
+        await inc_car_stats(
+            deleted_rental["id_car"], rentals=-1, revenue=-deleted_rental.get("total_amount", 0)
+        )
+        await record_deletion("rentals", ObjectId(id))
+        await bump_collection_version("rentals")
+    return deleted_rental is not None # si se elimina el renta se retorna True de lo contrario False
\ No newline at end of file
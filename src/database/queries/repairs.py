@@ -1,12 +1,59 @@
-from datetime import date
-from typing import Any # tipado de python
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, AsyncIterator # tipado de python
 from src.database.db import db # base de datos en mongodb
+from pymongo import ASCENDING, IndexModel # definición de índices
+from src.database.indexes import register_indexes # registro de índices
 from bson import ObjectId # clase para el id de mongodb 
-from src.database.mongo_serializers import serialize_doc, serialize_docs # serializadores
+from bson.errors import InvalidId # error de un id mal formado
+from pymongo import ReturnDocument # opción para obtener el documento actualizado
+from src.database.mongo_serializers import serialize_doc # serializadores
+from src.database.pagination import DEFAULT_PAGE_LIMIT, paginate # paginación por cursor
+from src.database.streaming import iter_documents # recorrido por streaming
+from src.database.versioning import bump_collection_version # versión de las colecciones
+from src.database.coalescing import coalesce, writes # agrupación de lecturas concurrentes
+from src.database.bulk import bulk_insert, bulk_update # escrituras masivas
+from src.database.changes import find_changes, now, record_deletion # sincronización incremental
+from src.database.queries.car_stats import inc_car_stats, inc_many_car_stats # estadísticas por auto
 
 
 repairs = db.repairs # colección para almacenar reparaciones
 
+# índices para los filtros de reparaciones por fecha, monto y auto
+register_indexes(
+    "repairs",
+    IndexModel([("registered_at", ASCENDING), ("mount", ASCENDING)], name="registered_at_mount"),
+    IndexModel([("id_car", ASCENDING), ("registered_at", ASCENDING)], name="id_car_registered_at"),
+    IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_id"),
+)
+
+
+def to_datetime(day: date) -> datetime:
+    """Función que convierte una fecha a la medianoche UTC de ese día (fecha de BSON).
+
+    Args:
+        day (date): Fecha a convertir
+
+    Returns:
+        datetime: Fecha y hora a las 00:00 UTC
+    """
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def serialize_repair_refs(repair: dict[str, Any]) -> dict[str, Any]:
+    """Función que convierte a str el ObjectId del auto de una reparación.
+
+    Args:
+        repair (dict[str, Any]): Documento de la reparación
+
+    Returns:
+        repair (dict[str, Any]): Documento con la referencia como str
+    """
+    repair["id_car"] = str(repair["id_car"])
+    # la fecha de registro se almacena como fecha de BSON y se expone como date
+    if isinstance(repair.get("registered_at"), datetime):
+        repair["registered_at"] = repair["registered_at"].date()
+    return repair
+
 
 async def find_repair(id: str) -> dict[str, Any]:
     """Función que busca por id una reparación en la base de datos.
@@ -21,59 +68,120 @@ async def find_repair(id: str) -> dict[str, Any]:
     repair = await repairs.find_one({"_id": ObjectId(id)})
     
     if repair: # si se encuentra se serializa y se retorna de lo contrario se retorna None
-        repair["id_car"] = str(repair["id_car"])
-        return serialize_doc(repair)
+        return serialize_doc(serialize_repair_refs(repair))
 
     return None
 
 
-async def find_repairs() -> list[dict[str, Any]]:
-    """Función para obtener todos los reparaciones de la base de datos.
+@coalesce("repairs")
+async def find_repairs(
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+) -> dict[str, Any]:
+    """Función para obtener una página de reparaciones de la base de datos.
+
+    Args:
+        limit (int): Número máximo de reparaciones por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Campo por el que se ordenan las reparaciones
+        descending (bool): True si el ordenamiento es descendente
+
+    Returns:
+        dict[str, Any]: Página de reparaciones y cursor de la siguiente página
+    """
+    # se obtiene sólo la página solicitada con la referencia al auto serializada
+    return await paginate(
+        repairs, {}, limit, after, sort_by, descending, transform=serialize_repair_refs
+    )
+
+
+def iter_repairs() -> AsyncIterator[dict[str, Any]]:
+    """Función para recorrer todas las reparaciones de la base de datos sin cargarlos en memoria.
 
     Returns:
-        repairs_list (list[dict[str, Any]]): Lista de reparaciones en la base de datos
+        AsyncIterator[dict[str, Any]]: Generador de reparaciones serializados
     """
-    repairs_list = [] # se crea una lista vacía para almacenar reparaciones
-    cursor = repairs.find({}) # se hace la búsqueda en la base de datos
+    return iter_documents(repairs, transform=serialize_repair_refs)
 
-    # se recorre de manera asíncrona el cursor con los reparaciones
-    async for document in cursor:
-        document["id_car"] = str(document["id_car"])
-        repairs_list.append(document) # se agregan los reparaciones a la lista
-    return serialize_docs(repairs_list) # se retorna la lista con las reparaciones ya serializadas
+async def find_repairs_changes(since: str | None = None, limit: int = DEFAULT_PAGE_LIMIT) -> dict[str, Any]:
+    """Función para obtener las reparaciones modificadas y eliminadas desde un token de sincronización.
 
+    Args:
+        since (str | None): Token de la consulta anterior (None para la carga inicial)
+        limit (int): Número máximo de reparaciones modificadas por respuesta
 
+    Returns:
+        dict[str, Any]: Reparaciones modificadas, ids eliminados y siguiente token
+    """
+    return await find_changes(repairs, since, limit, transform=serialize_repair_refs)
+
+
+@coalesce("repairs")
 async def find_repairs_by_filters(
     date_filter: date | None = None, 
-    mount_filter: float | None = None
-) -> list[dict[str, Any]]:
-    """Función para obtener reparaciones filtradas por fecha y/o monto.
+    mount_filter: float | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    mount_min: float | None = None,
+    mount_max: float | None = None,
+    id_car: str | None = None,
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+) -> dict[str, Any]:
+    """Función para obtener reparaciones filtradas por fecha, monto y/o auto.
     
     Args:
-        date_filter (date | None): Fecha de registro para filtrar (opcional)
-        mount_filter (float | None): Monto para filtrar (opcional)
+        date_filter (date | None): Fecha de registro exacta para filtrar (opcional)
+        mount_filter (float | None): Monto exacto para filtrar (opcional)
+        date_from (date | None): Fecha de registro inicial, inclusiva (opcional)
+        date_to (date | None): Fecha de registro final, inclusiva (opcional)
+        mount_min (float | None): Monto mínimo, inclusivo (opcional)
+        mount_max (float | None): Monto máximo, inclusivo (opcional)
+        id_car (str | None): ID del auto reparado (opcional)
+        limit (int): Número máximo de reparaciones por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Campo por el que se ordenan las reparaciones
+        descending (bool): True si el ordenamiento es descendente
         
     Returns:
-        list[dict[str, Any]]: Lista de reparaciones que coinciden con los filtros
+        dict[str, Any]: Página de reparaciones que coinciden con los filtros
     """
     query = {} # diccionario para almacenar queries
     
-    if date_filter is not None: # si se proporciona una fecha
-        query["registered_at"] = date_filter.isoformat()
-    
-    if mount_filter is not None: # si se proporciona un monto
-        query["mount"] = mount_filter
-    
-    repairs_list = [] # lista para almacenar las reparaciones
-    cursor = repairs.find(query) # se ejecuta el query a la base de datos
+    if id_car is not None: # si se proporciona un auto
+        query["id_car"] = ObjectId(id_car)
+
+    registered_at = {} # rango de fechas de registro
+    if date_filter is not None: # si se proporciona una fecha exacta
+        registered_at["$eq"] = to_datetime(date_filter)
+    if date_from is not None: # desde la medianoche de la fecha inicial
+        registered_at["$gte"] = to_datetime(date_from)
+    if date_to is not None: # hasta antes de la medianoche del día siguiente
+        registered_at["$lt"] = to_datetime(date_to + timedelta(days=1))
+    if registered_at:
+        query["registered_at"] = registered_at
+
+    mount = {} # rango de montos
+    if mount_filter is not None: # si se proporciona un monto exacto
+        mount["$eq"] = mount_filter
+    if mount_min is not None:
+        mount["$gte"] = mount_min
+    if mount_max is not None:
+        mount["$lte"] = mount_max
+    if mount:
+        query["mount"] = mount
     
-    async for document in cursor: # se recorre el cursor con los documentos filtrados
-        # se serializa el ID del carro para devolverlo en formato str
-        document["id_car"] = str(document["id_car"]) 
-        repairs_list.append(document) # se agrega el documento a la lista
-    return serialize_docs(repairs_list) # se serializa la lista de documentos su ID a str
+    # se ejecuta el query paginado a la base de datos
+    return await paginate(
+        repairs, query, limit, after, sort_by, descending, transform=serialize_repair_refs
+    )
 
 
+@writes("repairs")
 async def insert_repair(repair_data: dict[str, Any]) -> dict[str, Any]:
     """Función para insertar una reparación de reparación en la base de datos.
     
@@ -83,19 +191,100 @@ async def insert_repair(repair_data: dict[str, Any]) -> dict[str, Any]:
     Returns:
         created_repair (dict[str, Any]): reparación creado
     """
-    # se establece la fecha de inicio de la renta en formato y horario UTC
-    repair_data["registered_at"] = date.today().isoformat()
+    # se establece la fecha de registro como fecha de BSON en horario UTC
+    repair_data["registered_at"] = to_datetime(datetime.now(timezone.utc).date())
     repair_data["id_car"] = ObjectId(repair_data["id_car"])
+    repair_data["updated_at"] = now() # fecha de modificación para la sincronización
 
     # se inserta la nueva reparación en la base de datos
     new_repair = await repairs.insert_one(repair_data)
+    # la reparación se suma a las estadísticas del auto
+    await inc_car_stats(repair_data["id_car"], repairs=1, repair_spend=repair_data["mount"])
+
+    await bump_collection_version("repairs")
+
+    # se construye la reparación creada localmente a partir del id insertado
+    created_repair = {**repair_data, "_id": new_repair.inserted_id}
+    return serialize_doc(serialize_repair_refs(created_repair)) # se retorna ya serializada
+
+
+@writes("repairs")
+async def insert_many_repairs(repairs_data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Función para insertar reparaciones de forma masiva en la base de datos.
+
+    Args:
+        repairs_data (list[dict[str, Any]]): Datos de las reparaciones que se desean insertar
+
+    Returns:
+        list[dict[str, Any]]: Resultado de la inserción de cada reparación
+    """
+    registered_at = to_datetime(datetime.now(timezone.utc).date()) # misma fecha para todo el lote
+
+    def prepare(repair: dict[str, Any]) -> dict[str, Any]:
+        try:
+            repair["id_car"] = ObjectId(repair["id_car"])
+        except InvalidId: # la reparación se reporta con error sin detener el lote
+            raise ValueError("El ID del auto proporcionado no es válido.")
+        repair["registered_at"] = registered_at
+        repair["updated_at"] = now() # fecha de modificación para la sincronización
+        return repair
+
+    results = await bulk_insert(repairs, repairs_data, prepare)
+    created = [repair for repair, result in zip(repairs_data, results) if result["status"] == "created"]
+    if created: # las reparaciones creadas se suman a las estadísticas de sus autos
+        await inc_many_car_stats(
+            (repair["id_car"], {"repairs": 1, "repair_spend": repair["mount"]}) for repair in created
+        )
+        await bump_collection_version("repairs")
+    return results
 
-    # si la inserción fue éxitosa se busca la reparación
-    created_repair = await repairs.find_one({"_id": new_repair.inserted_id})
-    created_repair["id_car"] = str(created_repair["id_car"])
-    return serialize_doc(created_repair) # se retorna ya serializada
 
+@writes("repairs")
+async def update_many_repairs(updates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Función para actualizar reparaciones de forma masiva en la base de datos.
 
+    Args:
+        updates (list[dict[str, Any]]): ID y datos de cada reparación que se desea actualizar
+
+    Returns:
+        list[dict[str, Any]]: Resultado de la actualización de cada reparación
+    """
+    # se obtiene el monto previo de las reparaciones cuyo monto cambia para ajustar
+    # el gasto de sus autos con la diferencia, al igual que en update_one_repair
+    mount_ids = []
+    for update in updates:
+        if update.get("mount") is not None:
+            try:
+                mount_ids.append(ObjectId(update["id"]))
+            except InvalidId: # bulk_update lo reporta como error
+                pass
+    previous = {}
+    if mount_ids:
+        previous = {
+            repair["_id"]: repair
+            async for repair in repairs.find({"_id": {"$in": mount_ids}}, {"id_car": 1, "mount": 1})
+        }
+
+    results = await bulk_update(repairs, updates)
+
+    deltas = [] # diferencia de gasto por auto
+    for update, result in zip(updates, results):
+        if result["status"] != "updated" or update.get("mount") is None:
+            continue
+        repair = previous.get(ObjectId(result["id"]))
+        if repair is None:
+            continue
+        deltas.append((repair["id_car"], {"repair_spend": update["mount"] - repair.get("mount", 0)}))
+        repair["mount"] = update["mount"] # una actualización repetida parte del monto anterior
+    if deltas:
+        await inc_many_car_stats(deltas)
+
+    if any(result["status"] == "updated" for result in results):
+        await bump_collection_version("repairs")
+    return results
+
+
+@writes("repairs")
 async def update_one_repair(id: str, repair_data: dict[str, Any]) -> dict[str, Any]:
     """Función para actualizar una reparación en la base de datos.
 
@@ -108,18 +297,27 @@ async def update_one_repair(id: str, repair_data: dict[str, Any]) -> dict[str, A
     """
     # se obtienen sólo los datos proporcionados para actualizar el reparación
     repair = {k: v for k, v in repair_data.items() if v is not None}
+    repair["updated_at"] = now() # fecha de modificación para la sincronización
 
     # se actualiza el reparación en la base de datos con la información dada
-    result = await repairs.update_one({"_id": ObjectId(id)}, {"$set": repair})
-    if result.matched_count == 0: # si no se logra la actualización
+    # y se obtiene su estado previo en la misma operación
+    previous_repair = await repairs.find_one_and_update(
+        {"_id": ObjectId(id)}, {"$set": repair}, return_document=ReturnDocument.BEFORE
+    )
+    if previous_repair is None: # si no se logra la actualización
         return None # se retorna None
-    
-    # si la actualización fue éxitosa se busca el reparación actualizado
-    updated_repair = await repairs.find_one({"_id": ObjectId(id)})
-    updated_repair["id_car"] = str(updated_repair["id_car"])
-    return serialize_doc(updated_repair) # se retorna ya serializado
+
+    if "mount" in repair: # se ajusta el gasto del auto con la diferencia
+        await inc_car_stats(previous_repair["id_car"], repair_spend=repair["mount"] - previous_repair.get("mount", 0))
+
+    await bump_collection_version("repairs")
+
+    # se construye la reparación actualizada localmente a partir de su estado previo
+    updated_repair = {**previous_repair, **repair}
+    return serialize_doc(serialize_repair_refs(updated_repair)) # se retorna ya serializado
 
 
+@writes("repairs")
 async def delete_one_repair(id: str) -> bool:
     """Función para eliminar una reparación de reparación en la base de datos.
 
@@ -129,6 +327,12 @@ async def delete_one_repair(id: str) -> bool:
     Returns
         bool: True si la eliminación fue éxitosa
     """
-    # se realiza la eliminación del reparación de la base de datos    
-    result = await repairs.delete_one({"_id": ObjectId(id)})
-    return result.deleted_count == 1 # si se elimina el reparación se retorna True de lo contrario False
\ No newline at end of file
+    # se realiza la eliminación del reparación de la base de datos
+    deleted_repair = await repairs.find_one_and_delete(
+        {"_id": ObjectId(id)}, projection={"id_car": 1, "mount": 1}
+    )
+    if deleted_repair is not None: # la reparación se resta de las estadísticas del auto
+        await inc_car_stats(deleted_repair["id_car"], repairs=-1, repair_spend=-deleted_repair.get("mount", 0))
+        await record_deletion("repairs", ObjectId(id))
+        await bump_collection_version("repairs")
+    return deleted_repair is not None # si se elimina el reparación se retorna True de lo contrario False
\ No newline at end of file
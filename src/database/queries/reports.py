@@ -0,0 +1,97 @@
+import asyncio # ejecución concurrente de las agregaciones
+from datetime import date, timedelta
+from typing import Any # tipado de python
+from src.database.queries.cars import cars # colección de autos
+from src.database.queries.rentals import rentals # colección de rentas
+from src.database.queries.repairs import repairs, to_datetime # colección de reparaciones
+from src.database.coalescing import coalesce # agrupación de lecturas concurrentes
+
+
+async def aggregate_one(collection: Any, pipeline: list[dict[str, Any]]) -> dict[str, Any]:
+    """Función que ejecuta una agregación que produce un solo documento.
+
+    Args:
+        collection (Any): Colección de mongodb
+        pipeline (list[dict[str, Any]]): Etapas de la agregación
+
+    Returns:
+        dict[str, Any]: Documento resultante o un diccionario vacío
+    """
+    documents = await collection.aggregate(pipeline).to_list(length=1)
+    return documents[0] if documents else {}
+
+
+def first_value(facet: list[dict[str, Any]], key: str, default: Any = 0) -> Any:
+    """Función que obtiene un valor del primer documento de una faceta."""
+    return facet[0].get(key, default) if facet else default
+
+
+@coalesce("cars", "rentals", "repairs")
+async def find_dashboard(date_from: date, date_to: date, top: int = 5) -> dict[str, Any]:
+    """Función que calcula los indicadores del panel del dueño en una sola petición.
+
+    Ejecuta una agregación $facet por colección de forma concurrente, por lo que
+    sólo viajan los totales y no los documentos.
+
+    Args:
+        date_from (date): Fecha inicial del periodo, inclusiva
+        date_to (date): Fecha final del periodo, inclusiva
+        top (int): Número de autos más rentados a incluir
+
+    Returns:
+        dict[str, Any]: Indicadores de la flotilla, rentas y reparaciones del periodo
+    """
+    # rango del periodo como fechas de BSON en horario UTC
+    period = {"$gte": to_datetime(date_from), "$lt": to_datetime(date_to + timedelta(days=1))}
+
+    fleet, rentals_summary, repairs_summary = await asyncio.gather(
+        aggregate_one(cars, [
+            {"$facet": {
+                "total": [{"$count": "n"}],
+                "avaible": [{"$match": {"avaible": True}}, {"$count": "n"}],
+            }},
+        ]),
+        aggregate_one(rentals, [
+            {"$match": {"start_date": period}},
+            {"$facet": {
+                "totals": [{"$group": {
+                    "_id": None,
+                    "count": {"$sum": 1},
+                    "revenue": {"$sum": "$total_amount"},
+                }}],
+                "top_cars": [
+                    {"$group": {
+                        "_id": "$id_car",
+                        "rentals": {"$sum": 1},
+                        "revenue": {"$sum": "$total_amount"},
+                    }},
+                    {"$sort": {"rentals": -1, "_id": 1}},
+                    {"$limit": top},
+                ],
+            }},
+        ]),
+        aggregate_one(repairs, [
+            {"$match": {"registered_at": period}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "spend": {"$sum": "$mount"}}},
+        ]),
+    )
+
+    fleet_size = first_value(fleet.get("total"), "n")
+    avaible_cars = first_value(fleet.get("avaible"), "n")
+    totals = rentals_summary.get("totals")
+
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "fleet_size": fleet_size,
+        "avaible_cars": avaible_cars,
+        "rented_cars": fleet_size - avaible_cars,
+        "rentals": first_value(totals, "count"),
+        "rental_revenue": first_value(totals, "revenue", 0.0),
+        "repairs": repairs_summary.get("count", 0),
+        "repair_spend": repairs_summary.get("spend", 0.0),
+        "top_cars": [
+            {"id_car": str(car["_id"]), "rentals": car["rentals"], "revenue": car["revenue"]}
+            for car in rentals_summary.get("top_cars", [])
+        ],
+    }
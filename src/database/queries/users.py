@@ -1,10 +1,42 @@
+import os # interacción con el sistema operativo
 from typing import Any # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from src.cache import TTLCache # caché en memoria con expiración
+from src.metrics import CallbackCounter # métricas en formato prometheus
 from src.database.db import db # base de datos en mongodb
-from src.database.mongo_serializers import serialize_doc, serialize_docs
+from bson import ObjectId # clase para el id de mongodb
+from pymongo import ReturnDocument # opción para obtener el documento actualizado
+from pymongo import ASCENDING, IndexModel # definición de índices
+from src.database.indexes import register_indexes # registro de índices
+from src.database.mongo_serializers import serialize_doc
+from src.database.pagination import DEFAULT_PAGE_LIMIT, paginate # paginación por cursor
+from src.schemas.users import UserInDB # esquema del usuario almacenado
+from src.database.changes import now # fecha de modificación
+
+load_dotenv() # se cargan las variables de entorno
 
 
 users = db.users # colección para almacenar usuarios
 
+# índice único para la búsqueda de usuarios en cada petición autenticada
+register_indexes(
+    "users",
+    IndexModel([("username", ASCENDING)], unique=True, name="username_unique"),
+)
+
+# caché de usuarios autenticados para evitar una consulta en cada petición
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", 60)),
+)
+
+CallbackCounter(
+    "user_cache_lookups_total",
+    "Lecturas de la caché de usuarios autenticados por resultado",
+    lambda: {("hit",): user_cache.hits, ("miss",): user_cache.misses},
+    ("result",),
+)
+
 
 async def find_user(username: str) -> dict[str, Any]:
     """Función que busca por username un usuario en la base de datos.
@@ -22,19 +54,53 @@ async def find_user(username: str) -> dict[str, Any]:
     return serialize_doc(user) if user else None
 
 
-async def find_users() -> list[dict[str, Any]]:
-    """Función para obtener todos los usuarios de la base de datos.
+async def find_cached_user(username: str) -> UserInDB | None:
+    """Función que busca un usuario usando primero la caché en memoria.
+
+    Args:
+        username (str): nombre de usuario
 
     Returns:
-        users_list (list[dict[str, Any]]): Lista de usuarios en la base de datos
+        user (UserInDB | None): usuario almacenado o None si no existe
     """
-    users_list = [] # se crea una lista vacía para almacenar usuarios
-    cursor = users.find({}) # se hace la búsqueda en la base de datos
+    user = user_cache.get(username)
+    if user is None: # si no está en caché se busca en la base de datos
+        user_dict = await find_user(username)
+        if not user_dict:
+            return None # los usuarios inexistentes no se guardan en caché
+        user = UserInDB(**user_dict)
+        user_cache.set(username, user)
+    return user
 
-    # se recorre de manera asíncrona el cursor con los usuarios
-    async for document in cursor:
-        users_list.append(document) # se agregan los usuarios a la lista
-    return serialize_docs(users_list) # se retorna la lista con las usuarios ya serializados
+
+def invalidate_user(username: str) -> None:
+    """Función que elimina de la caché a un usuario insertado o modificado.
+
+    Args:
+        username (str): nombre de usuario
+    """
+    user_cache.delete(username)
+
+
+async def find_users(
+    limit: int = DEFAULT_PAGE_LIMIT,
+    after: str | None = None,
+    sort_by: str = "_id",
+    descending: bool = False,
+) -> dict[str, Any]:
+    """Función para obtener una página de usuarios de la base de datos.
+
+    Args:
+        limit (int): Número máximo de usuarios por página
+        after (str | None): Cursor de la página anterior (opcional)
+        sort_by (str): Campo por el que se ordenan los usuarios
+        descending (bool): True si el ordenamiento es descendente
+
+    Returns:
+        dict[str, Any]: Página de usuarios y cursor de la siguiente página
+    """
+    # se obtiene sólo la página solicitada en lugar de toda la colección
+    return await paginate(users, {}, limit, after, sort_by, descending)
 
 
 
@@ -47,9 +113,33 @@ async def insert_user(user_data: dict[str, Any]) -> dict[str, Any]:
     Returns:
         created_user (dict[str, Any]): usuario creado
     """
+    user_data["updated_at"] = now() # fecha de modificación
+
     # se inserta el nuevo usuario en la base de datos
     new_user = await users.insert_one(user_data)
+    invalidate_user(user_data["username"]) # se invalida cualquier entrada previa
+
+    # se construye el usuario creado localmente a partir del id insertado
+    created_user = {**user_data, "_id": new_user.inserted_id}
+    return serialize_doc(created_user) # se retorna ya serializada
 
-    # si la inserción fue éxitosa se busca la tarea
-    created_user = await users.find_one({"_id": new_user.inserted_id})
-    return serialize_doc(created_user) # se retorna ya serializada
\ No newline at end of file
+
+async def revoke_user_tokens(id: str) -> dict[str, Any]:
+    """Función para revocar todos los tokens emitidos a un usuario incrementando su versión.
+
+    Args:
+        id (str): ID del usuario
+
+    Returns:
+        user (dict[str, Any]): Usuario actualizado, o None si no existe
+    """
+    user = await users.find_one_and_update(
+        {"_id": ObjectId(id)},
+        {"$inc": {"token_version": 1}, "$set": {"updated_at": now()}},
+        return_document=ReturnDocument.AFTER
+    )
+    if user is None: # si no se encuentra el usuario
+        return None
+
+    invalidate_user(user["username"]) # se invalida la entrada en caché
+    return serialize_doc(user) # se retorna ya serializado
@@ -0,0 +1,34 @@
+import os # interacción con el sistema operativo
+from typing import Any, AsyncIterator, Callable # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from src.database.mongo_serializers import serialize_doc # serializador de documentos
+
+load_dotenv() # se cargan las variables de entorno
+
+# número de documentos que el cursor pide a mongodb en cada lote
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+
+async def iter_documents(
+    collection: Any,
+    query: dict[str, Any] | None = None,
+    transform: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[dict[str, Any]]:
+    """Generador que recorre una colección documento por documento sin acumularla en memoria.
+
+    Args:
+        collection (Any): Colección de mongodb a recorrer
+        query (dict[str, Any] | None): Filtro de la consulta (opcional)
+        transform (Callable | None): Función aplicada a cada documento antes de serializarlo
+        batch_size (int): Tamaño de lote del cursor
+
+    Yields:
+        dict[str, Any]: Documento serializado
+    """
+    # updated_at es un sello interno de la sincronización y no forma parte de la exportación
+    cursor = collection.find(query or {}, {"updated_at": 0}).batch_size(batch_size)
+    async for document in cursor: # se serializa cada documento conforme llega
+        if transform:
+            document = transform(document)
+        yield serialize_doc(document)
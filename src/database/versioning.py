@@ -0,0 +1,29 @@
+from src.database.db import db # base de datos en mongodb
+
+
+collection_versions = db.collection_versions # versión de cada colección
+
+
+async def get_collection_version(name: str) -> int:
+    """Función que obtiene la versión actual de una colección.
+
+    La versión cambia con cada escritura, por lo que permite saber si un listado
+    cambió sin consultar sus documentos.
+
+    Args:
+        name (str): Nombre de la colección
+
+    Returns:
+        int: Versión de la colección (0 si nunca se ha escrito)
+    """
+    state = await collection_versions.find_one({"_id": name})
+    return state["version"] if state else 0
+
+
+async def bump_collection_version(name: str) -> None:
+    """Función que incrementa la versión de una colección después de una escritura.
+
+    Args:
+        name (str): Nombre de la colección
+    """
+    await collection_versions.update_one({"_id": name}, {"$inc": {"version": 1}}, upsert=True)
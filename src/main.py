@@ -1,9 +1,11 @@
 import os
+from contextlib import asynccontextmanager
 from typing import Any
 from dotenv import load_dotenv
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from src.routes.cars import cars
 from src.routes.customers import customers
@@ -11,9 +13,35 @@ from src.routes.rentals import rentals
 from src.routes.repairs import repairs
 from src.routes.auth import auth
 from src.routes.users import users
-
-
-app = FastAPI(title="Drive and Deal Backend")
+from src.routes.reports import reports
+from src.database.db import db, connect, close, get_pool_stats
+from src.database.indexes import ensure_indexes
+from src.database.changes import sync_clock
+from src.database.change_stream import car_stream
+from src.security.revocation import token_versions
+from src.metrics import render_metrics
+from src.middleware import MetricsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # se abren las conexiones del pool antes de recibir tráfico
+    await connect()
+    # updated_at se fija con el reloj de mongodb para que coincida entre procesos
+    await sync_clock(db)
+    # se aseguran los índices declarados por los módulos de consultas
+    await ensure_indexes(db)
+    # se carga la tabla de versiones de tokens y se refresca en segundo plano
+    await token_versions.refresh()
+    token_versions.start()
+    yield
+    token_versions.stop()
+    # se terminan los streams de eventos y se cierran las conexiones al apagar la aplicación
+    car_stream.close()
+    close()
+
+
+app = FastAPI(title="Drive and Deal Backend", lifespan=lifespan)
 
 
 load_dotenv()
@@ -27,6 +55,8 @@ app.add_middleware(
     allow_headers = ["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 
 app.include_router(
     router = auth,
@@ -39,6 +69,16 @@ def read_root() -> dict[str, Any]:
     return {'msg': 'welcome to drive and deal backend'}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health", include_in_schema=False)
+def health() -> dict[str, Any]:
+    return {'status': 'ok', 'mongo_pool': get_pool_stats()}
+
+
 app.include_router(
     router = cars,
     prefix = "/api/cars",
@@ -65,6 +105,13 @@ app.include_router(
 )
 
 
+app.include_router(
+    router = reports,
+    prefix = "/api/reports",
+    tags = ["Reportes"]
+)
+
+
 app.include_router(
     router = users,
     prefix = "/api/users",
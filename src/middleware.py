@@ -0,0 +1,44 @@
+import time # reloj de alta resolución para medir latencias
+from starlette.types import ASGIApp, Message, Receive, Scope, Send # tipos de asgi
+from src.metrics import Counter, Histogram # métricas en formato prometheus
+
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Duración de las peticiones http por ruta",
+    ("method", "route"),
+)
+http_requests = Counter(
+    "http_requests_total",
+    "Peticiones http por ruta y código de estado",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """Middleware asgi que registra la latencia y el código de estado de cada ruta."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http": # websockets y lifespan no se miden
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500 # si la aplicación falla antes de responder
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # se usa la plantilla de la ruta (p. ej. /api/cars/{id}) para acotar las etiquetas
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_seconds.observe(time.perf_counter() - start, scope["method"], route)
+            http_requests.inc(scope["method"], route, str(status_code))
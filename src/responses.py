@@ -0,0 +1,179 @@
+import os # interacción con el sistema operativo
+import json # codificación json de la librería estándar
+import hashlib # hash de las etiquetas ETag
+from datetime import date, datetime # tipos de fecha
+from functools import lru_cache # memoización de los adaptadores precompilados
+from typing import Any, AsyncIterator, Literal # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from fastapi import Request # petición http
+from fastapi.responses import Response, StreamingResponse # respuestas http
+from pydantic import TypeAdapter # validación y serialización compiladas de pydantic
+
+load_dotenv() # se cargan las variables de entorno
+
+# activa la serialización rápida de los listados (opcional)
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+
+# formatos de exportación soportados por las rutas /export
+ExportFormat = Literal["ndjson", "json"]
+
+
+def json_default(value: Any) -> Any:
+    """Función que convierte a json los tipos que no soporta la librería estándar."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value) # ObjectId y otros tipos de bson se envían como str
+
+
+async def encode_ndjson(documents: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Generador que codifica cada documento como una línea json."""
+    async for document in documents:
+        yield (json.dumps(document, default=json_default) + "\n").encode("utf-8")
+
+
+async def encode_json_array(documents: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Generador que codifica los documentos como un arreglo json."""
+    separator = b"["
+    async for document in documents:
+        yield separator + json.dumps(document, default=json_default).encode("utf-8")
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]" # arreglo vacío si no hubo documentos
+
+
+def export_response(
+    documents: AsyncIterator[dict[str, Any]],
+    format: ExportFormat = "ndjson",
+) -> StreamingResponse:
+    """Función que construye la respuesta por streaming de una exportación.
+
+    Args:
+        documents (AsyncIterator[dict[str, Any]]): Documentos serializados
+        format (ExportFormat): Formato de salida (ndjson o json)
+
+    Returns:
+        StreamingResponse: Respuesta que envía los documentos conforme se leen
+    """
+    if format == "json":
+        return StreamingResponse(encode_json_array(documents), media_type="application/json")
+    return StreamingResponse(encode_ndjson(documents), media_type="application/x-ndjson")
+
+
+
+@lru_cache(maxsize=None)
+def get_adapter(model: Any) -> TypeAdapter:
+    """Función que retorna un TypeAdapter precompilado y reutilizable para un modelo."""
+    return TypeAdapter(model)
+
+
+def fast_json_response(model: Any, data: Any, headers: dict[str, str] | None = None) -> Any:
+    """Función que serializa una respuesta directamente a bytes json con pydantic-core.
+
+    Valida los datos una sola vez con un adaptador precompilado y los codifica en
+    rust, evitando que FastAPI los convierta a diccionarios y luego a json. El
+    resultado tiene la misma forma que produciría el response_model de la ruta.
+
+    Args:
+        model (Any): Modelo de la respuesta (p. ej. Page[Car])
+        data (Any): Datos a serializar
+        headers (dict[str, str] | None): Encabezados de la respuesta rápida (opcional)
+
+    Returns:
+        Any: Response con el json ya codificado, o los datos sin cambios si la
+            serialización rápida está deshabilitada
+    """
+    if not FAST_JSON_RESPONSES:
+        return data
+    return model_json_response(model, data, headers)
+
+
+def model_json_response(model: Any, data: Any, headers: dict[str, str] | None = None) -> Response:
+    """Función que serializa una respuesta con un modelo elegido en la ruta.
+
+    Se usa cuando la forma de la respuesta depende de los parámetros (p. ej. expand),
+    por lo que no basta con el response_model fijo de la ruta.
+
+    Args:
+        model (Any): Modelo de la respuesta (p. ej. Page[Rental])
+        data (Any): Datos a serializar
+        headers (dict[str, str] | None): Encabezados de la respuesta (opcional)
+
+    Returns:
+        Response: Respuesta con el json ya codificado
+    """
+    adapter = get_adapter(model)
+    return Response(
+        adapter.dump_json(adapter.validate_python(data)),
+        media_type="application/json",
+        headers=headers
+    )
+
+
+
+def make_etag(value: str) -> str:
+    """Función que genera una etiqueta ETag fuerte a partir de un texto."""
+    return '"' + hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+
+def collection_etag(request: Request, version: int | str) -> str:
+    """Función que genera la ETag de un listado sin consultar sus documentos.
+
+    Args:
+        request (Request): Petición con la ruta y los parámetros del listado
+        version (int | str): Versión actual de la colección (o de varias, unidas en un str)
+
+    Returns:
+        str: ETag del listado
+    """
+    return make_etag(f"{version}:{request.url.path}?{request.url.query}")
+
+
+def document_etag(document: dict[str, Any]) -> str:
+    """Función que genera la ETag de un documento a partir de su contenido.
+
+    Args:
+        document (dict[str, Any]): Documento serializado
+
+    Returns:
+        str: ETag del documento
+    """
+    return make_etag(repr(sorted(document.items())))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Función que indica si el cliente ya tiene la versión vigente (If-None-Match).
+
+    Args:
+        request (Request): Petición http
+        etag (str): ETag vigente
+
+    Returns:
+        bool: True si alguna de las etiquetas enviadas coincide
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match usa comparación débil, por lo que se ignora el prefijo W/
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def not_modified(etag: str) -> Response:
+    """Función que construye la respuesta 304 sin cuerpo."""
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def etag_json_response(model: Any, data: Any, response: Response, etag: str) -> Any:
+    """Función que agrega la ETag a la respuesta, ya sea rápida o con response_model.
+
+    Args:
+        model (Any): Modelo de la respuesta
+        data (Any): Datos a serializar
+        response (Response): Respuesta inyectada por FastAPI
+        etag (str): ETag de los datos
+
+    Returns:
+        Any: Datos o Response con la ETag
+    """
+    response.headers["ETag"] = etag
+    return fast_json_response(model, data, headers={"ETag": etag})
@@ -24,8 +24,15 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
     
     access_token_expires = timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)))
+    # el token incluye los datos necesarios para autorizar sin consultar la base de datos
     access_token = create_access_token(
-        data={"sub": user.username},
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "role": user.role,
+            "disabled": user.disabled,
+            "ver": user.token_version,
+        },
         expires_delta=access_token_expires
     )
 
@@ -1,26 +1,101 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from bson.errors import InvalidId
-from src.schemas.cars import Car, CarCreate, CarUpdate
+from src.schemas.cars import Car, CarCreate, CarUpdate, CarBulkUpdate, CarSortField
+from src.schemas.pagination import Page, SortOrder
+from src.schemas.changes import Changes
+from src.schemas.bulk import BulkReport
+from src.bulk import BULK_OPENAPI, read_bulk_items, run_bulk
+from src.database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursor
+from src.responses import (
+    ExportFormat,
+    export_response,
+    collection_etag,
+    document_etag,
+    etag_matches,
+    etag_json_response,
+    not_modified
+)
 from src.database.queries.cars import (
     find_cars,
+    find_cars_changes,
+    find_cars_version,
+    iter_cars,
     find_car,
     find_cars_by_filters,
     insert_car,
+    insert_many_cars,
+    update_many_cars,
     update_one_car,
     delete_one_car
 )
+from src.database.change_stream import car_stream, event_stream
 from src.security.dependencies import check_manager, check_employee, check_employee_or_manager
 
 cars = APIRouter()
 
 # RF07: Accesible por empleados y managers
-@cars.get("/", response_model=list[Car])
-async def get_all_cars(user = Depends(check_employee_or_manager)) -> list[Car]:
-    cars_list = await find_cars()
-    return cars_list
+@cars.get("/", response_model=Page[Car])
+async def get_all_cars(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = None,
+    sort_by: CarSortField = "id",
+    order: SortOrder = "asc",
+    user = Depends(check_employee_or_manager)
+) -> Page[Car]:
+    # la ETag del listado depende sólo de la versión de la colección y los parámetros
+    etag = collection_etag(request, await find_cars_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        cars_page = await find_cars(limit, after, sort_by, order == "desc")
+        return etag_json_response(Page[Car], cars_page, response, etag)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# RF07: Sincronización incremental desde un token
+@cars.get("/changes", response_model=Changes[Car])
+async def get_cars_changes(
+    since: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    user = Depends(check_employee_or_manager)
+) -> Changes[Car]:
+    try:
+        return await find_cars_changes(since, limit)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# RF07: Disponibilidad de autos en vivo (Server-Sent Events)
+@cars.get("/stream")
+async def stream_cars(user = Depends(check_employee_or_manager)) -> StreamingResponse:
+    return StreamingResponse(
+        event_stream(car_stream),
+        media_type="text/event-stream",
+        # se evita que proxies almacenen o agrupen los eventos
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# RF07: Exportación completa por streaming
+@cars.get("/export")
+async def export_cars(format: ExportFormat = "ndjson", user = Depends(check_employee_or_manager)):
+    return export_response(iter_cars(), format)
 
 @cars.get("/{id}", response_model=Car)
-async def get_car(id: str, user = Depends(check_employee_or_manager)) -> Car:
+async def get_car(
+    id: str,
+    request: Request,
+    response: Response,
+    user = Depends(check_employee_or_manager)
+) -> Car:
     try:
         stored_car = await find_car(id)
         if not stored_car:
@@ -28,6 +103,12 @@ async def get_car(id: str, user = Depends(check_employee_or_manager)) -> Car:
                 status_code = 404,
                 detail = f"No se ha encontrado el auto con el ID {id} en la base de datos."
             )
+
+        # si el cliente ya tiene la versión vigente no se serializa el documento
+        etag = document_etag(stored_car)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         return stored_car
     except InvalidId:
         raise HTTPException(
@@ -36,13 +117,30 @@ async def get_car(id: str, user = Depends(check_employee_or_manager)) -> Car:
         )
     
 # RF07: Accesible por empleados y managers
-@cars.get("/filter/", response_model=list[Car])
+@cars.get("/filter/", response_model=Page[Car])
 async def filter_cars(
+    request: Request,
+    response: Response,
     avaible: bool | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = None,
+    sort_by: CarSortField = "id",
+    order: SortOrder = "asc",
     user = Depends(check_employee)
-) -> list[Car]:
-    cars_list = await find_cars_by_filters(avaible)
-    return cars_list
+) -> Page[Car]:
+    # la ETag del listado depende sólo de la versión de la colección y los parámetros
+    etag = collection_etag(request, await find_cars_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        cars_page = await find_cars_by_filters(avaible, limit, after, sort_by, order == "desc")
+        return etag_json_response(Page[Car], cars_page, response, etag)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
 
 # RF02: Solo manager
 @cars.post("/", response_model=Car)
@@ -55,6 +153,18 @@ async def create_car(car_data: CarCreate, user = Depends(check_manager)) -> Car:
         )
     return response
 
+# RF02: Alta masiva (arreglo json o NDJSON)
+@cars.post("/bulk", response_model=BulkReport, openapi_extra=BULK_OPENAPI)
+async def create_cars_bulk(request: Request, user = Depends(check_manager)) -> BulkReport:
+    items = await read_bulk_items(request)
+    return await run_bulk(items, CarCreate, insert_many_cars)
+
+# RF02: Actualización masiva (arreglo json o NDJSON con el id de cada auto)
+@cars.put("/bulk", response_model=BulkReport, openapi_extra=BULK_OPENAPI)
+async def update_cars_bulk(request: Request, user = Depends(check_manager)) -> BulkReport:
+    items = await read_bulk_items(request)
+    return await run_bulk(items, CarBulkUpdate, update_many_cars)
+
 # RF02: Solo manager
 @cars.put("/{id}", response_model=Car)
 async def update_car(id: str, car_data: CarUpdate, user = Depends(check_manager)) -> Car:
@@ -1,10 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from bson.errors import InvalidId
-from src.schemas.customers import Customer, CustomerCreate, CustomerUpdate
+from src.schemas.customers import Customer, CustomerCreate, CustomerUpdate, CustomerBulkUpdate, CustomerSortField
+from src.schemas.pagination import Page, SortOrder
+from src.schemas.changes import Changes
+from src.schemas.bulk import BulkReport
+from src.bulk import BULK_OPENAPI, read_bulk_items, run_bulk
+from src.database.versioning import get_collection_version
+from src.database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursor
+from src.responses import (
+    ExportFormat,
+    export_response,
+    collection_etag,
+    document_etag,
+    etag_matches,
+    etag_json_response,
+    not_modified
+)
 from src.database.queries.customers import (
     find_customers,
+    find_customers_changes,
+    iter_customers,
     find_customer,
     insert_customer,
+    insert_many_customers,
+    update_many_customers,
     update_one_customer,
     delete_one_customer
 )
@@ -13,14 +32,58 @@ from src.security.dependencies import check_employee
 customers = APIRouter()
 
 # RF01: Solo empleado
-@customers.get("/", response_model=list[Customer])
-async def get_all_customers(user = Depends(check_employee)) -> list[Customer]:
-    customers_list = await find_customers()
-    return customers_list
+@customers.get("/", response_model=Page[Customer])
+async def get_all_customers(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = None,
+    sort_by: CustomerSortField = "id",
+    order: SortOrder = "asc",
+    user = Depends(check_employee)
+) -> Page[Customer]:
+    # la ETag del listado depende sólo de la versión de la colección y los parámetros
+    etag = collection_etag(request, await get_collection_version("customers"))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        customers_page = await find_customers(limit, after, sort_by, order == "desc")
+        return etag_json_response(Page[Customer], customers_page, response, etag)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# RF01: Sincronización incremental desde un token
+@customers.get("/changes", response_model=Changes[Customer])
+async def get_customers_changes(
+    since: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    user = Depends(check_employee)
+) -> Changes[Customer]:
+    try:
+        return await find_customers_changes(since, limit)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# RF01: Exportación completa por streaming
+@customers.get("/export")
+async def export_customers(format: ExportFormat = "ndjson", user = Depends(check_employee)):
+    return export_response(iter_customers(), format)
 
 # RF01: Solo empleado
 @customers.get("/{id}", response_model=Customer)
-async def get_customer(id: str, user = Depends(check_employee)) -> Customer:
+async def get_customer(
+    id: str,
+    request: Request,
+    response: Response,
+    user = Depends(check_employee)
+) -> Customer:
     try:
         stored_customer = await find_customer(id)
         if not stored_customer:
@@ -28,6 +91,12 @@ async def get_customer(id: str, user = Depends(check_employee)) -> Customer:
                 status_code = 404,
                 detail = f"No se ha encontrado el cliente con el ID {id} en la base de datos."
             )
+
+        # si el cliente ya tiene la versión vigente no se serializa el documento
+        etag = document_etag(stored_customer)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         return stored_customer
     except InvalidId:
         raise HTTPException(
@@ -46,6 +115,18 @@ async def create_customer(customer_data: CustomerCreate, user = Depends(check_em
         )
     return response
 
+# RF01: Alta masiva (arreglo json o NDJSON)
+@customers.post("/bulk", response_model=BulkReport, openapi_extra=BULK_OPENAPI)
+async def create_customers_bulk(request: Request, user = Depends(check_employee)) -> BulkReport:
+    items = await read_bulk_items(request)
+    return await run_bulk(items, CustomerCreate, insert_many_customers)
+
+# RF01: Actualización masiva (arreglo json o NDJSON con el id de cada cliente)
+@customers.put("/bulk", response_model=BulkReport, openapi_extra=BULK_OPENAPI)
+async def update_customers_bulk(request: Request, user = Depends(check_employee)) -> BulkReport:
+    items = await read_bulk_items(request)
+    return await run_bulk(items, CustomerBulkUpdate, update_many_customers)
+
 # RF01: Solo empleado
 @customers.put("/{id}", response_model=Customer)
 async def update_customer(id: str, customer_data: CustomerUpdate, user = Depends(check_employee)) -> Customer:
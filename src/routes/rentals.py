@@ -1,50 +1,146 @@
-from datetime import date, timedelta
-from collections import Counter
+import asyncio
+from typing import get_args
 from bson.errors import InvalidId
-from fastapi import APIRouter, HTTPException, Depends
-from src.schemas.rentals import Rental, RentalCreate, RentalUpdate
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from src.schemas.rentals import Rental, RentalCreate, RentalUpdate, RentalSortField, RentalExpand, RentalDetail, MostRentedCar
+from src.schemas.pagination import Page, SortOrder
+from src.schemas.changes import Changes
+from src.database.versioning import get_collection_version
+from src.database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursor
+from src.responses import (
+    ExportFormat,
+    export_response,
+    collection_etag,
+    document_etag,
+    etag_matches,
+    model_json_response,
+    not_modified
+)
 from src.database.queries.rentals import (
     find_rentals,
+    RENTAL_EXPANSIONS,
+    find_rentals_changes,
+    iter_rentals,
     find_rental,
+    find_most_rented_cars,
     insert_rental,
-    update_one_rental
+    update_one_rental,
+    CarNotAvailable
 )
-from src.security.dependencies import check_employee
+from src.security.dependencies import check_employee, check_employee_or_manager
 
 rentals = APIRouter()
 
+
+def parse_expand(expand: str | None) -> tuple[str, ...]:
+    """Función que obtiene las entidades a incluir del parámetro expand (p. ej. "customer,car").
+
+    Raises:
+        HTTPException: 400 si se solicita una entidad no soportada
+
+    Returns:
+        tuple[str, ...]: Entidades sin repetir en un orden estable
+    """
+    names = {name.strip() for name in (expand or "").split(",") if name.strip()}
+    invalid = names - set(get_args(RentalExpand))
+    if invalid:
+        raise HTTPException(
+            status_code = 400,
+            detail = f"No se puede expandir: {', '.join(sorted(invalid))}."
+        )
+    return tuple(sorted(names))
+
+
+async def rentals_version(expand: tuple[str, ...]) -> str:
+    """Función que obtiene la versión de las rentas y de las colecciones incluidas."""
+    names = ["rentals", *(RENTAL_EXPANSIONS[name][0] for name in expand)]
+    versions = await asyncio.gather(*(get_collection_version(name) for name in names))
+    return ".".join(str(version) for version in versions)
+
+
 # RF05: Accesible por empleados y managers
-@rentals.get("/", response_model=list[Rental])
+@rentals.get("/", response_model=Page[Rental] | Page[RentalDetail])
 async def get_all_rentals(
-    filter_rental: bool = None,
+    request: Request,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = None,
+    sort_by: RentalSortField = "id",
+    order: SortOrder = "asc",
+    expand: str | None = Query(default=None, description="Entidades a incluir: customer,car"),
+    user = Depends(check_employee)
+) -> Page[Rental] | Page[RentalDetail]:
+    expand_names = parse_expand(expand)
+    # la ETag del listado depende de las versiones de las colecciones y los parámetros
+    etag = collection_etag(request, await rentals_version(expand_names))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        rentals_page = await find_rentals(limit, after, sort_by, order == "desc", expand_names)
+        # sin expand se conserva la forma de Rental (sin customer ni car)
+        model = Page[RentalDetail] if expand_names else Page[Rental]
+        return model_json_response(model, rentals_page, {"ETag": etag})
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# RF05: Sincronización incremental desde un token
+@rentals.get("/changes", response_model=Changes[Rental])
+async def get_rentals_changes(
+    since: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
     user = Depends(check_employee)
-) -> list[Rental]:
-    rentals_list = await find_rentals()
-
-    if filter_rental:
-        two_months_ago = date.today() - timedelta(days=60)
-        recent_rentals = [
-            rental for rental in rentals_list
-            if rental["start_date"] >= two_months_ago
-        ]
-        car_ids = [rental["id_car"] for rental in recent_rentals]
-        car_count = Counter(car_ids)
-        most_rented = car_count.most_common()
-        return most_rented
-    
-    return rentals_list
+) -> Changes[Rental]:
+    try:
+        return await find_rentals_changes(since, limit)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# RF05: Exportación completa por streaming
+@rentals.get("/export")
+async def export_rentals(format: ExportFormat = "ndjson", user = Depends(check_employee)):
+    return export_response(iter_rentals(), format)
+
+# RF06: Accesible por empleados y managers
+@rentals.get("/most-rented/", response_model=list[MostRentedCar])
+async def get_most_rented_cars(
+    days: int = Query(default=60, ge=1, le=3650),
+    top: int = Query(default=10, ge=1, le=100),
+    include_car: bool = False,
+    user = Depends(check_employee_or_manager)
+) -> list[MostRentedCar]:
+    ranking = await find_most_rented_cars(days, top, include_car)
+    return ranking
 
 # RF05: Accesible por empleados y managers
-@rentals.get("/{id}", response_model=Rental)
-async def get_rental(id: str, user = Depends(check_employee)) -> Rental:
+@rentals.get("/{id}", response_model=Rental | RentalDetail)
+async def get_rental(
+    id: str,
+    request: Request,
+    expand: str | None = Query(default=None, description="Entidades a incluir: customer,car"),
+    user = Depends(check_employee)
+) -> Rental | RentalDetail:
     try:
-        stored_rental = await find_rental(id)
+        expand_names = parse_expand(expand)
+        stored_rental = await find_rental(id, expand_names)
         if not stored_rental:
             raise HTTPException(
                 status_code = 404,
                 detail = f"No se ha encontrado la renta con el ID {id} en la base de datos."
             )
-        return stored_rental
+
+        # si el cliente ya tiene la versión vigente no se serializa el documento
+        etag = document_etag(stored_rental)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        # sin expand se conserva la forma de Rental (sin customer ni car)
+        model = RentalDetail if expand_names else Rental
+        return model_json_response(model, stored_rental, {"ETag": etag})
     except InvalidId:
         raise HTTPException(
             status_code = 400,
@@ -54,13 +150,24 @@ async def get_rental(id: str, user = Depends(check_employee)) -> Rental:
 # RF05: Solo empleado
 @rentals.post("/", response_model=Rental)
 async def create_rental(rental_data: RentalCreate, user = Depends(check_employee)) -> Rental:
-    response = await insert_rental(rental_data.model_dump())
-    if not response:
+    try:
+        response = await insert_rental(rental_data.model_dump())
+        if not response:
+            raise HTTPException(
+                status_code = 500,
+                detail = "Ocurrió un error inesperado. Por favor intente más tarde."
+            )
+        return response
+    except InvalidId:
+        raise HTTPException(
+            status_code = 400,
+            detail = "El ID proporcionado no es válido."
+        )
+    except CarNotAvailable as e:
         raise HTTPException(
-            status_code = 500,
-            detail = "Ocurrió un error inesperado. Por favor intente más tarde."
+            status_code = 409,
+            detail = str(e)
         )
-    return response
 
 # RF05: Solo empleado
 @rentals.put("/{id}", response_model=Rental)
@@ -1,12 +1,31 @@
 from datetime import date
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from bson.errors import InvalidId 
-from src.schemas.repairs import Repair, RepairCreate, RepairUpdate
+from src.schemas.repairs import Repair, RepairCreate, RepairUpdate, RepairBulkUpdate, RepairSortField
+from src.schemas.pagination import Page, SortOrder
+from src.schemas.changes import Changes
+from src.schemas.bulk import BulkReport
+from src.bulk import BULK_OPENAPI, read_bulk_items, run_bulk
+from src.database.versioning import get_collection_version
+from src.database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursor
+from src.responses import (
+    ExportFormat,
+    export_response,
+    collection_etag,
+    document_etag,
+    etag_matches,
+    etag_json_response,
+    not_modified
+)
 from src.database.queries.repairs import (
     find_repairs,
+    find_repairs_changes,
+    iter_repairs,
     find_repair,
     find_repairs_by_filters,
     insert_repair,
+    insert_many_repairs,
+    update_many_repairs,
     update_one_repair
 )
 from src.security.dependencies import check_manager_or_owner, check_manager, check_owner
@@ -14,14 +33,58 @@ from src.security.dependencies import check_manager_or_owner, check_manager, che
 repairs = APIRouter()
 
 # RF03: Accesible por managers y dueños
-@repairs.get("/", response_model=list[Repair])
-async def get_all_repairs(user = Depends(check_manager_or_owner)) -> list[Repair]:
-    repairs_list = await find_repairs()
-    return repairs_list
+@repairs.get("/", response_model=Page[Repair])
+async def get_all_repairs(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = None,
+    sort_by: RepairSortField = "id",
+    order: SortOrder = "asc",
+    user = Depends(check_manager_or_owner)
+) -> Page[Repair]:
+    # la ETag del listado depende sólo de la versión de la colección y los parámetros
+    etag = collection_etag(request, await get_collection_version("repairs"))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        repairs_page = await find_repairs(limit, after, sort_by, order == "desc")
+        return etag_json_response(Page[Repair], repairs_page, response, etag)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# RF03: Sincronización incremental desde un token
+@repairs.get("/changes", response_model=Changes[Repair])
+async def get_repairs_changes(
+    since: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    user = Depends(check_manager_or_owner)
+) -> Changes[Repair]:
+    try:
+        return await find_repairs_changes(since, limit)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# RF03: Exportación completa por streaming
+@repairs.get("/export")
+async def export_repairs(format: ExportFormat = "ndjson", user = Depends(check_manager_or_owner)):
+    return export_response(iter_repairs(), format)
 
 # RF03: Accesible por managers y dueños
 @repairs.get("/{id}", response_model=Repair)
-async def get_repair(id: str, user = Depends(check_manager_or_owner)) -> Repair:
+async def get_repair(
+    id: str,
+    request: Request,
+    response: Response,
+    user = Depends(check_manager_or_owner)
+) -> Repair:
     try:
         stored_repair = await find_repair(id)
         if not stored_repair:
@@ -29,6 +92,12 @@ async def get_repair(id: str, user = Depends(check_manager_or_owner)) -> Repair:
                 status_code = 404,
                 detail = f"No se ha encontrado la reparación con el ID {id} en la base de datos."
             )
+
+        # si el cliente ya tiene la versión vigente no se serializa el documento
+        etag = document_etag(stored_repair)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         return stored_repair
     except InvalidId:
         raise HTTPException(
@@ -37,14 +106,53 @@ async def get_repair(id: str, user = Depends(check_manager_or_owner)) -> Repair:
         )
     
 # RF04: Solo dueño
-@repairs.get("/filter/", response_model=list[Repair])
+@repairs.get("/filter/", response_model=Page[Repair])
 async def filter_repairs(
+    request: Request,
+    response: Response,
     registered_at: date | None = None, 
     mount: float | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    mount_min: float | None = Query(default=None, ge=0),
+    mount_max: float | None = Query(default=None, ge=0),
+    id_car: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = None,
+    sort_by: RepairSortField = "id",
+    order: SortOrder = "asc",
     user = Depends(check_owner)
-) -> list[Repair]:
-    repairs_list = await find_repairs_by_filters(registered_at, mount)
-    return repairs_list
+) -> Page[Repair]:
+    # la ETag del listado depende sólo de la versión de la colección y los parámetros
+    etag = collection_etag(request, await get_collection_version("repairs"))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        repairs_page = await find_repairs_by_filters(
+            date_filter = registered_at,
+            mount_filter = mount,
+            date_from = date_from,
+            date_to = date_to,
+            mount_min = mount_min,
+            mount_max = mount_max,
+            id_car = id_car,
+            limit = limit,
+            after = after,
+            sort_by = sort_by,
+            descending = order == "desc"
+        )
+        return etag_json_response(Page[Repair], repairs_page, response, etag)
+    except InvalidId:
+        raise HTTPException(
+            status_code = 400,
+            detail = "El ID proporcionado no es válido."
+        )
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
 
 # RF03: Solo manager
 @repairs.post("/", response_model=Repair)
@@ -57,6 +165,18 @@ async def create_repair(repair_data: RepairCreate, user = Depends(check_manager)
         )
     return response
 
+# RF03: Alta masiva (arreglo json o NDJSON)
+@repairs.post("/bulk", response_model=BulkReport, openapi_extra=BULK_OPENAPI)
+async def create_repairs_bulk(request: Request, user = Depends(check_manager)) -> BulkReport:
+    items = await read_bulk_items(request)
+    return await run_bulk(items, RepairCreate, insert_many_repairs)
+
+# RF03: Actualización masiva (arreglo json o NDJSON con el id de cada reparación)
+@repairs.put("/bulk", response_model=BulkReport, openapi_extra=BULK_OPENAPI)
+async def update_repairs_bulk(request: Request, user = Depends(check_manager)) -> BulkReport:
+    items = await read_bulk_items(request)
+    return await run_bulk(items, RepairBulkUpdate, update_many_repairs)
+
 # RF03: Solo manager
 @repairs.put("/{id}", response_model=Repair)
 async def update_repair(id: str, repair_data: RepairUpdate, user = Depends(check_manager)) -> Repair:
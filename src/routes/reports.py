@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+from fastapi import APIRouter, HTTPException, Depends, Query
+from bson.errors import InvalidId
+from src.schemas.reports import Dashboard, CarStats, CarStatsSortField
+from src.schemas.pagination import Page, SortOrder
+from src.database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursor
+from src.database.queries.reports import find_dashboard
+from src.database.queries.car_stats import find_car_stats, find_fleet_stats
+from src.security.dependencies import check_owner
+
+reports = APIRouter()
+
+# Solo dueño: indicadores del periodo (por defecto los últimos 30 días)
+@reports.get("/dashboard", response_model=Dashboard)
+async def get_dashboard(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    top: int = Query(default=5, ge=1, le=50),
+    user = Depends(check_owner)
+) -> Dashboard:
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code = 400,
+            detail = "La fecha inicial no puede ser posterior a la fecha final."
+        )
+
+    dashboard = await find_dashboard(date_from, date_to, top)
+    return dashboard
+
+# Solo dueño: rentas, ingresos y gasto en reparaciones acumulados por auto
+@reports.get("/cars", response_model=Page[CarStats])
+async def get_fleet_stats(
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = None,
+    sort_by: CarStatsSortField = "id",
+    order: SortOrder = "asc",
+    user = Depends(check_owner)
+) -> Page[CarStats]:
+    try:
+        return await find_fleet_stats(limit, after, sort_by, order == "desc")
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+# Solo dueño: estadísticas acumuladas de un auto
+@reports.get("/cars/{id}", response_model=CarStats)
+async def get_car_stats(id: str, user = Depends(check_owner)) -> CarStats:
+    try:
+        stats = await find_car_stats(id)
+    except InvalidId:
+        raise HTTPException(
+            status_code = 400,
+            detail = "El ID proporcionado no es válido."
+        )
+    if stats is None:
+        raise HTTPException(
+            status_code = 404,
+            detail = f"No se ha encontrado el auto con el ID {id} en la base de datos."
+        )
+    return stats
@@ -1,12 +1,35 @@
-from fastapi import APIRouter, HTTPException
-from src.schemas.users import User, UserCreate
-from src.database.queries.users import find_user, insert_user
-from src.security.security import get_hashed_password
+from fastapi import APIRouter, Depends, HTTPException, Query
+from bson.errors import InvalidId
+from src.schemas.users import User, UserCreate, UserSortField
+from src.schemas.pagination import Page, SortOrder
+from src.database.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursor
+from src.database.queries.users import find_user, find_users, insert_user, revoke_user_tokens
+from src.security.security import get_hashed_password_async
+from src.security.dependencies import check_owner
+from src.security.revocation import token_versions
 
 
 users = APIRouter()
 
 
+# Solo dueño: listado de usuarios (p. ej. para obtener el ID al revocar sus tokens)
+@users.get("/", response_model=Page[User])
+async def get_all_users(
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = None,
+    sort_by: UserSortField = "id",
+    order: SortOrder = "asc",
+    user = Depends(check_owner)
+) -> Page[User]:
+    try:
+        return await find_users(limit, after, sort_by, order == "desc")
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = str(e)
+        )
+
+
 @users.post("/", response_model=User)
 async def create_user(user_data: UserCreate) -> User:
     # Verificar que las contraseñas coincidan
@@ -25,12 +48,13 @@ async def create_user(user_data: UserCreate) -> User:
         )
     
     # Hashear la contraseña
-    hashed_password = get_hashed_password(user_data.password)
+    hashed_password = await get_hashed_password_async(user_data.password)
     
     # Crear el diccionario de usuario
     user_dict = user_data.model_dump(exclude={"password", "password_confirm"})
     user_dict["hashed_password"] = hashed_password
     user_dict["disabled"] = False
+    user_dict["token_version"] = 0
     
     response = await insert_user(user_dict)
     if not response:
@@ -38,4 +62,24 @@ async def create_user(user_data: UserCreate) -> User:
             status_code=500,
             detail="Ocurrió un error inesperado. Por favor intente más tarde."
         )
-    return response
\ No newline at end of file
+    return response
+
+
+# Solo dueño: invalida todas las sesiones abiertas de un usuario
+@users.post("/{id}/revoke-tokens")
+async def revoke_tokens(id: str, user = Depends(check_owner)) -> dict[str, str]:
+    try:
+        response = await revoke_user_tokens(id)
+        if not response:
+            raise HTTPException(
+                status_code = 404,
+                detail = f"No se ha encontrado el usuario con el ID {id} en la base de datos."
+            )
+        # la revocación aplica de inmediato en este proceso
+        token_versions.set(id, response["token_version"], response["disabled"])
+        return {"msg": "Tokens revocados correctamente."}
+    except InvalidId:
+        raise HTTPException(
+            status_code = 400,
+            detail = "El ID proporcionado no es válido."
+        )
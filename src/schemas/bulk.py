@@ -0,0 +1,18 @@
+from typing import Literal
+from pydantic import BaseModel
+
+
+class BulkItemResult(BaseModel):
+    '''Clase con el resultado de un elemento de una operación masiva.'''
+    index: int # posición del elemento en el cuerpo de la petición
+    status: Literal["created", "updated", "not_found", "error"]
+    id: str | None = None
+    error: str | None = None
+
+
+class BulkReport(BaseModel):
+    '''Clase con el reporte de una operación masiva.'''
+    total: int
+    succeeded: int
+    failed: int
+    items: list[BulkItemResult]
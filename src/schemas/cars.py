@@ -1,6 +1,11 @@
+from typing import Literal
 from pydantic import BaseModel, Field
 
 
+# campos por los que se pueden ordenar los listados paginados
+CarSortField = Literal["id", "brand", "model", "year", "license_plate"]
+
+
 class Car(BaseModel):
     id: str
     brand: str
@@ -48,4 +53,9 @@ class CarUpdate(BaseModel):
     year: int | None = Field(default=None, ge=1886, le=2100)
     license_plate: str | None = Field(default=None, min_length=5, max_length=12)
     avaible: bool | None = None
-    state: str | None = Field(default=None, min_length=3, max_length=20)
\ No newline at end of file
+    state: str | None = Field(default=None, min_length=3, max_length=20)
+
+
+class CarBulkUpdate(CarUpdate):
+    '''Clase para actualizar un auto dentro de una operación masiva.'''
+    id: str
@@ -0,0 +1,13 @@
+from typing import Generic, TypeVar
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+
+class Changes(BaseModel, Generic[T]):
+    '''Clase genérica para devolver los cambios de una colección desde un token.'''
+    changed: list[T] # documentos creados o modificados
+    deleted: list[str] # ids de los documentos eliminados
+    next_token: str # token para la siguiente consulta
+    has_more: bool # True si quedan cambios pendientes de entregar
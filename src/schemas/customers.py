@@ -1,6 +1,11 @@
+from typing import Literal
 from pydantic import BaseModel, Field, EmailStr
 
 
+# campos por los que se pueden ordenar los listados paginados
+CustomerSortField = Literal["id", "name", "email"]
+
+
 class Customer(BaseModel):
     id: str
     name: str
@@ -20,4 +25,9 @@ class CustomerUpdate(BaseModel):
     name: str | None = Field(default=None, min_length=2, max_length=50)
     email: EmailStr | None = None
     phone_number: str | None = Field(default=None, min_length=7, max_length=15)
-    address: str | None = Field(default=None, min_length=5, max_length=100)
\ No newline at end of file
+    address: str | None = Field(default=None, min_length=5, max_length=100)
+
+
+class CustomerBulkUpdate(CustomerUpdate):
+    '''Clase para actualizar un cliente dentro de una operación masiva.'''
+    id: str
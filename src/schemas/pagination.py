@@ -0,0 +1,14 @@
+from typing import Generic, Literal, TypeVar
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+# dirección de ordenamiento aceptada por los endpoints de listado
+SortOrder = Literal["asc", "desc"]
+
+
+class Page(BaseModel, Generic[T]):
+    '''Clase genérica para devolver una página de resultados con su cursor.'''
+    items: list[T]
+    next_cursor: str | None = None # None cuando ya no hay más páginas
@@ -1,6 +1,15 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
+from src.schemas.cars import Car
+from src.schemas.customers import Customer
+
+
+# campos por los que se pueden ordenar los listados paginados
+RentalSortField = Literal["id", "start_date", "total_amount"]
+
+# entidades relacionadas que se pueden incluir con el parámetro expand
+RentalExpand = Literal["customer", "car"]
 
 
 class Rental(BaseModel):
@@ -14,6 +23,12 @@ class Rental(BaseModel):
     return_status: str = None
 
 
+class RentalDetail(Rental):
+    '''Clase de una renta con el cliente y el auto incluidos si se solicitan con expand.'''
+    customer: Optional[Customer] = None
+    car: Optional[Car] = None
+
+
 class RentalCreate(BaseModel):
     id_customer: str = Field(min_length=1, example="66a1b...")
     id_car: str = Field(min_length=1, example="66a1c...")
@@ -24,4 +39,11 @@ class RentalUpdate(BaseModel):
     end_date: Optional[datetime] = None
     total_amount: Optional[float] = Field(default=None, ge=0)
     returned: Optional[bool] = None
-    return_status: Optional[str] = Field(default=None, min_length=3, max_length=30)
\ No newline at end of file
+    return_status: Optional[str] = Field(default=None, min_length=3, max_length=30)
+
+
+class MostRentedCar(BaseModel):
+    id_car: str
+    rentals: int # número de rentas en el periodo
+    brand: Optional[str] = None
+    model: Optional[str] = None
\ No newline at end of file
@@ -1,8 +1,12 @@
-from typing import Optional
+from typing import Literal, Optional
 from datetime import date
 from pydantic import BaseModel, Field
 
 
+# campos por los que se pueden ordenar los listados paginados
+RepairSortField = Literal["id", "registered_at", "mount"]
+
+
 class Repair(BaseModel):
     id: str
     id_car: str
@@ -19,4 +23,9 @@ class RepairCreate(BaseModel):
 
 class RepairUpdate(BaseModel):
     description: Optional[str] = Field(default=None, min_length=5, max_length=100)
-    mount: Optional[float] = Field(default=None, ge=0)
\ No newline at end of file
+    mount: Optional[float] = Field(default=None, ge=0)
+
+
+class RepairBulkUpdate(RepairUpdate):
+    '''Clase para actualizar una reparación dentro de una operación masiva.'''
+    id: str
@@ -0,0 +1,36 @@
+from datetime import date
+from typing import Literal
+from pydantic import BaseModel
+
+
+# contadores por los que se puede ordenar la flotilla
+CarStatsSortField = Literal["id", "rentals", "revenue", "repair_spend"]
+
+
+class TopCar(BaseModel):
+    id_car: str
+    rentals: int # número de rentas en el periodo
+    revenue: float # ingresos de las rentas en el periodo
+
+
+class Dashboard(BaseModel):
+    '''Clase con los indicadores del panel del dueño para un periodo.'''
+    date_from: date
+    date_to: date
+    fleet_size: int
+    avaible_cars: int
+    rented_cars: int
+    rentals: int
+    rental_revenue: float
+    repairs: int
+    repair_spend: float
+    top_cars: list[TopCar]
+
+
+class CarStats(BaseModel):
+    '''Clase con las estadísticas acumuladas de un auto desde su alta.'''
+    id_car: str
+    rentals: int # número de rentas
+    revenue: float # ingresos de las rentas
+    repairs: int # número de reparaciones
+    repair_spend: float # gasto en reparaciones
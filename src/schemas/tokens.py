@@ -3,4 +3,12 @@ from pydantic import BaseModel
 
 class Token(BaseModel):
     access_token: str
-    token_type: str # Tipo (bearer)
\ No newline at end of file
+    token_type: str # Tipo (bearer)
+
+
+class TokenUser(BaseModel):
+    '''Clase con el usuario autenticado obtenido de los claims del token.'''
+    id: str
+    username: str
+    role: str
+    disabled: bool
\ No newline at end of file
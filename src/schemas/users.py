@@ -1,7 +1,11 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 
 
+# campos por los que se pueden ordenar los listados paginados
+UserSortField = Literal["id", "username"]
+
+
 class User(BaseModel):
     '''Clase base de usuario para enviar datos al frontend.'''
     id: str
@@ -14,6 +18,7 @@ class User(BaseModel):
 class UserInDB(User):
     '''Clase para mostrar todos los datos almacenados en MongoDB del usuario.'''
     hashed_password: str
+    token_version: int = 0 # se incrementa para revocar los tokens emitidos
 
 
 class UserCreate(BaseModel):
@@ -1,15 +1,28 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from .security import decode_token, verify_password
+from .security import decode_token, verify_password_async
 from src.schemas.users import User, UserInDB
-from src.database.queries.users import find_user
+from src.schemas.tokens import TokenUser
+from src.database.queries.users import find_user, find_cached_user
+from src.security.revocation import token_versions
+from src.metrics import Counter
+
+
+# claims que permiten autorizar sin consultar la base de datos
+TOKEN_CLAIMS = {"sub", "uid", "role", "disabled", "ver"}
+
+auth_requests = Counter(
+    "auth_requests_total",
+    "Peticiones autenticadas según el origen de los datos del usuario",
+    ("source",),
+)
 
 
 # Ruta donde se va a generar el token de acceso
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User | TokenUser:
     try:
         payload = decode_token(token)
         username = payload.get("sub")
@@ -20,16 +33,40 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
                 detail="Credenciales inválidas",
                 headers={"WWW-Authenticate": "Bearer"}
             )
+
+        if TOKEN_CLAIMS <= payload.keys():
+            # se autoriza desde los claims firmados y la tabla de versiones en memoria
+            if not await token_versions.verify(payload):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token revocado",
+                    headers={"WWW-Authenticate": "Bearer"}
+                )
+            auth_requests.inc("claims")
+            return TokenUser(
+                id=payload["uid"],
+                username=username,
+                role=payload["role"],
+                disabled=payload["disabled"]
+            )
         
-        user_dict = await find_user(username)
-        if not user_dict:
+        # los tokens emitidos sin claims consultan primero la caché de usuarios
+        auth_requests.inc("database")
+        user = await find_cached_user(username)
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Usuario no encontrado",
                 headers={"WWW-Authenticate": "Bearer"}
             )
+        if user.disabled:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuario deshabilitado",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
             
-        return UserInDB(**user_dict)
+        return user
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,7 +82,8 @@ async def authenticate_user(username: str, password: str):
     
     user = UserInDB(**user_dict)
     
-    if not verify_password(password, user.hashed_password):
+    # bcrypt se ejecuta fuera del event loop
+    if not await verify_password_async(password, user.hashed_password):
         return None
         
     return user
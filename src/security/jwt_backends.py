@@ -0,0 +1,126 @@
+import hmac # firma y comparación en tiempo constante
+import json # codificación del encabezado y los claims
+import time # fecha actual para la expiración
+import base64 # codificación base64 url-safe de los segmentos
+import hashlib # funciones hash de las firmas HMAC
+from abc import ABC, abstractmethod # interfaz de los backends
+from calendar import timegm # conversión de fechas a timestamp UTC
+from datetime import datetime # fechas en los claims
+from typing import Any # tipado de python
+from jose import jwt # implementación de referencia de JWT
+from jose.exceptions import JWTError # errores de python-jose
+
+
+class TokenError(Exception):
+    """Excepción común de los backends cuando un token no es válido o expiró."""
+
+
+class JWTBackend(ABC):
+    """Interfaz de los backends de firma y verificación de JWT."""
+
+    @abstractmethod
+    def encode(self, payload: dict[str, Any], key: str, algorithm: str) -> str:
+        """Firma los claims y retorna el token."""
+
+    @abstractmethod
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]:
+        """Verifica la firma y la expiración; lanza TokenError si el token no es válido."""
+
+
+class JoseBackend(JWTBackend):
+    """Backend basado en python-jose; soporta todos los algoritmos de la librería."""
+
+    def encode(self, payload: dict[str, Any], key: str, algorithm: str) -> str:
+        return jwt.encode(payload, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]:
+        try:
+            return jwt.decode(token, key, algorithms=[algorithm])
+        except JWTError as e:
+            raise TokenError(str(e))
+
+
+def b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class HMACBackend(JWTBackend):
+    """Backend mínimo para HS256/HS384/HS512 con la librería estándar.
+
+    Evita el análisis genérico de llaves y encabezados de python-jose: sólo
+    calcula el HMAC, lo compara en tiempo constante y valida exp y nbf.
+    """
+
+    DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def sign(self, signing_input: bytes, key: str, algorithm: str) -> bytes:
+        return hmac.new(key.encode("utf-8"), signing_input, self.DIGESTS[algorithm]).digest()
+
+    def encode(self, payload: dict[str, Any], key: str, algorithm: str) -> str:
+        claims = dict(payload)
+        for claim in ("exp", "iat", "nbf"): # las fechas se envían como timestamp
+            if isinstance(claims.get(claim), datetime):
+                claims[claim] = timegm(claims[claim].utctimetuple())
+
+        header = b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode("utf-8"))
+        body = b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        signing_input = header + b"." + body
+        return (signing_input + b"." + b64encode(self.sign(signing_input, key, algorithm))).decode("ascii")
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]:
+        try:
+            signing_input, _, signature = token.encode("ascii").rpartition(b".")
+            header_segment, _, payload_segment = signing_input.partition(b".")
+            header = json.loads(b64decode(header_segment))
+            signature = b64decode(signature)
+        except (ValueError, UnicodeError):
+            raise TokenError("Formato de token inválido.")
+
+        # el algoritmo del encabezado debe ser el configurado (evita alg=none)
+        if not isinstance(header, dict) or header.get("alg") != algorithm:
+            raise TokenError("Algoritmo de token no permitido.")
+        if not hmac.compare_digest(signature, self.sign(signing_input, key, algorithm)):
+            raise TokenError("Firma de token inválida.")
+
+        try:
+            payload = json.loads(b64decode(payload_segment))
+        except (ValueError, UnicodeError):
+            raise TokenError("Formato de token inválido.")
+        if not isinstance(payload, dict):
+            raise TokenError("Formato de token inválido.")
+
+        now = time.time()
+        for claim in ("exp", "nbf"):
+            if claim in payload and not isinstance(payload[claim], (int, float)):
+                raise TokenError(f"El claim {claim} no es válido.")
+        if "exp" in payload and now >= payload["exp"]:
+            raise TokenError("El token ha expirado.")
+        if "nbf" in payload and now < payload["nbf"]:
+            raise TokenError("El token aún no es válido.")
+        return payload
+
+
+def get_jwt_backend(name: str, algorithm: str) -> JWTBackend:
+    """Función que construye el backend de JWT configurado.
+
+    Args:
+        name (str): Nombre del backend ("jose" o "hmac")
+        algorithm (str): Algoritmo de firma configurado
+
+    Raises:
+        ValueError: Si el backend no existe o no soporta el algoritmo
+
+    Returns:
+        JWTBackend: Backend de JWT
+    """
+    if name == "jose":
+        return JoseBackend()
+    if name == "hmac":
+        if algorithm not in HMACBackend.DIGESTS:
+            raise ValueError(f"El backend hmac sólo soporta {', '.join(HMACBackend.DIGESTS)}.")
+        return HMACBackend()
+    raise ValueError(f"Backend de JWT desconocido: {name}")
@@ -0,0 +1,107 @@
+import os # interacción con el sistema operativo
+import asyncio # tarea de refresco en segundo plano
+import logging # registro de eventos de la aplicación
+from datetime import datetime, timedelta # fechas del refresco incremental
+from typing import Any # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from bson import ObjectId # clase para el id de mongodb
+from bson.errors import InvalidId # error de un id mal formado
+from src.database.changes import CHANGES_SAFETY_SECONDS, now # fecha de modificación
+from src.database.queries.users import users # colección de usuarios
+from src.metrics import Gauge # métricas en formato prometheus
+
+load_dotenv() # se cargan las variables de entorno
+
+logger = logging.getLogger(__name__)
+
+# segundos entre cada refresco de la tabla de versiones de tokens
+TOKEN_VERSIONS_REFRESH_SECONDS = float(os.getenv("TOKEN_VERSIONS_REFRESH_SECONDS", 10))
+
+
+class TokenVersionTable:
+    """Tabla en memoria con la versión de tokens y el estado de cada usuario.
+
+    Permite autorizar desde los claims del token sin consultar la base de datos:
+    un token es válido si su versión coincide con la de la tabla y el usuario no
+    está deshabilitado. La tabla se refresca en segundo plano sólo con los
+    usuarios modificados, por lo que una revocación hecha en otro proceso tarda
+    como máximo TOKEN_VERSIONS_REFRESH_SECONDS en aplicarse.
+    """
+
+    def __init__(self, refresh_seconds: float = TOKEN_VERSIONS_REFRESH_SECONDS) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.entries: dict[str, tuple[int, bool]] = {} # versión y disabled por id de usuario
+        self.last_refresh: datetime | None = None # fecha del último refresco
+        self.task: asyncio.Task | None = None # tarea de refresco en segundo plano
+
+    def set(self, uid: str, token_version: int, disabled: bool) -> None:
+        """Método que actualiza la entrada de un usuario (p. ej. tras revocar sus tokens)."""
+        self.entries[uid] = (token_version, disabled)
+
+    def store(self, user: dict[str, Any]) -> tuple[int, bool]:
+        """Método que guarda la entrada de un documento de usuario y la retorna."""
+        entry = (user.get("token_version", 0), bool(user.get("disabled", False)))
+        self.entries[str(user["_id"])] = entry
+        return entry
+
+    async def refresh(self) -> None:
+        """Método que carga los usuarios modificados desde el último refresco."""
+        started_at = now()
+        query: dict[str, Any] = {}
+        if self.last_refresh is not None: # se vuelve a revisar una ventana corta
+            query = {"updated_at": {"$gte": self.last_refresh - timedelta(seconds=CHANGES_SAFETY_SECONDS)}}
+
+        async for user in users.find(query, {"token_version": 1, "disabled": 1}):
+            self.store(user)
+        self.last_refresh = started_at
+
+    async def verify(self, claims: dict[str, Any]) -> bool:
+        """Método que indica si los claims de un token siguen vigentes.
+
+        Args:
+            claims (dict[str, Any]): Claims del token ya verificado
+
+        Returns:
+            bool: True si la versión coincide y el usuario no está deshabilitado
+        """
+        entry = self.entries.get(claims["uid"])
+        if entry is None: # usuario creado después del último refresco
+            try:
+                user = await users.find_one({"_id": ObjectId(claims["uid"])}, {"token_version": 1, "disabled": 1})
+            except InvalidId:
+                return False
+            if user is None:
+                return False
+            entry = self.store(user)
+
+        token_version, disabled = entry
+        return token_version == claims["ver"] and not disabled
+
+    async def run(self) -> None:
+        """Método que refresca la tabla periódicamente."""
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e: # se conserva la tabla anterior ante errores
+                logger.warning("No se pudo refrescar la tabla de versiones de tokens: %s", e)
+
+    def start(self) -> None:
+        """Método que inicia el refresco en segundo plano."""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        """Método que detiene el refresco en segundo plano."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+
+token_versions = TokenVersionTable() # tabla compartida por el proceso
+
+Gauge(
+    "token_versions_entries",
+    "Usuarios en la tabla de versiones de tokens",
+    lambda: len(token_versions.entries),
+)
@@ -1,17 +1,66 @@
 import os
+import time
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import bcrypt
 from fastapi import HTTPException, status
-from jose import jwt
-from jose.exceptions import JWTError
 from datetime import datetime, timedelta, timezone
 from typing import Any
+from src.cache import TTLCache
+from src.metrics import CallbackCounter, Counter, Gauge, Histogram
+from src.security.jwt_backends import TokenError, get_jwt_backend
 
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+# backend de JWT: "jose" (todos los algoritmos) o "hmac" (sólo HS256/HS384/HS512, más rápido)
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose")
+# tokens verificados que se recuerdan hasta su expiración (0 deshabilita la caché)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 4096))
+
+jwt_backend = get_jwt_backend(JWT_BACKEND, ALGORITHM)
+
+# caché de tokens verificados: llave = digest del token, valor = claims
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=0)
+token_cache_lock = threading.Lock() # las rutas síncronas se ejecutan en hilos
+
+CallbackCounter(
+    "token_cache_lookups_total",
+    "Lecturas de la caché de tokens verificados por resultado",
+    lambda: {("hit",): token_cache.hits, ("miss",): token_cache.misses},
+    ("result",),
+)
+
+# hilos dedicados a bcrypt (libera el GIL) para no bloquear el event loop
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+
+# tareas de bcrypt en curso o en espera, para rechazar peticiones con el pool saturado
+password_hash_stats = {"pending": 0}
+
+Gauge(
+    "password_hash_pending",
+    "Operaciones de bcrypt en curso o en espera",
+    lambda: password_hash_stats["pending"],
+)
+password_hash_operations = Counter(
+    "password_hash_operations_total",
+    "Operaciones de bcrypt por resultado",
+    ("result",),
+)
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds",
+    "Latencia de las operaciones de bcrypt, incluida la espera en el pool",
+)
 
 
 def get_hashed_password(password: str) -> str:
@@ -24,6 +73,40 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
+async def run_password_task(func, *args) -> Any:
+    """Ejecuta una operación de bcrypt en el pool de hilos con control de saturación.
+
+    Si ya hay demasiadas operaciones pendientes se responde de inmediato con 503
+    en lugar de encolar la petición.
+    """
+    if password_hash_stats["pending"] >= PASSWORD_HASH_MAX_PENDING:
+        password_hash_operations.inc("rejected")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servicio saturado. Por favor intente más tarde.",
+            headers={"Retry-After": "1"}
+        )
+
+    password_hash_stats["pending"] += 1
+    start = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        elapsed = time.perf_counter() - start
+        password_hash_stats["pending"] -= 1
+        password_hash_operations.inc("completed")
+        password_hash_duration.observe(elapsed)
+
+
+async def get_hashed_password_async(password: str) -> str:
+    return await run_password_task(get_hashed_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_password_task(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -31,19 +114,34 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt_backend.encode(to_encode, SECRET_KEY, ALGORITHM)
 
 
 def decode_token(token: str) -> dict[str, Any]:
+    """Verifica un token y retorna sus claims, recordándolo hasta su expiración.
+
+    Los terminales reutilizan el mismo token en miles de peticiones, por lo que
+    sólo la primera paga la verificación de la firma.
+    """
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    with token_cache_lock:
+        payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload) # copia para que el llamador no altere la caché
+
     try:
-        payload = jwt.decode(
-            token,
-            SECRET_KEY,
-            algorithms=[ALGORITHM]
-        )
-        return payload
-    except JWTError as e:
+        payload = jwt_backend.decode(token, SECRET_KEY, ALGORITHM)
+    except TokenError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token inválido o expirado: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+    # sólo se recuerdan los tokens con expiración, y únicamente hasta ella
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = exp - time.time()
+        if ttl > 0:
+            with token_cache_lock:
+                token_cache.set(key, payload, ttl)
+    return dict(payload)
\ No newline at end of file
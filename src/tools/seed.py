@@ -0,0 +1,289 @@
+"""Generador de datos sintéticos para autos, clientes, rentas y reparaciones.
+
+Ejecuta en la terminal: python -m src.tools.seed --help
+
+Los documentos siguen los esquemas de src/schemas y son consistentes entre sí:
+las rentas y reparaciones apuntan a autos y clientes existentes, y los autos con
+una renta abierta no están disponibles. Con la misma semilla y la misma fecha
+final se generan exactamente los mismos documentos (incluidos sus ObjectId),
+sin importar el número de procesos.
+"""
+import os # interacción con el sistema operativo
+import sys # salida del proceso
+import time # medición del tiempo de carga
+import random # generación pseudoaleatoria con semilla
+import struct # construcción de los ObjectId
+import asyncio # tareas finales con el cliente de la aplicación
+import argparse # argumentos de la línea de comandos
+from concurrent.futures import ProcessPoolExecutor, as_completed # procesos en paralelo
+from dataclasses import dataclass # configuración inmutable de la carga
+from datetime import date, datetime, time as day_start, timedelta, timezone # fechas
+from typing import Any, Iterator # tipado de python
+from dotenv import load_dotenv # función para cargar de variables entorno
+from bson import ObjectId # clase para el id de mongodb
+from pymongo import MongoClient # cliente síncrono para los procesos de carga
+
+load_dotenv() # se cargan las variables de entorno
+
+# colecciones en orden de carga y etiqueta de sus ObjectId
+COLLECTIONS = {"cars": 1, "customers": 2, "rentals": 3, "repairs": 4}
+
+BRANDS = {
+    "Nissan": ["Versa", "Sentra", "March", "Kicks", "X-Trail"],
+    "Toyota": ["Corolla", "Yaris", "Camry", "RAV4", "Hilux"],
+    "Volkswagen": ["Jetta", "Vento", "Golf", "Tiguan", "Polo"],
+    "Chevrolet": ["Aveo", "Onix", "Spark", "Tracker", "Cavalier"],
+    "Mazda": ["Mazda 2", "Mazda 3", "CX-3", "CX-5", "CX-30"],
+    "Honda": ["Civic", "City", "HR-V", "CR-V", "Fit"],
+    "Kia": ["Rio", "Forte", "Soul", "Seltos", "Sportage"],
+}
+FIRST_NAMES = ["Juan", "María", "José", "Ana", "Luis", "Sofía", "Carlos", "Lucía", "Jorge", "Elena"]
+LAST_NAMES = ["García", "Hernández", "López", "Martínez", "González", "Pérez", "Rodríguez", "Sánchez"]
+REPAIRS = ["Cambio de aceite y filtro", "Cambio de balatas", "Alineación y balanceo",
+           "Reparación de suspensión", "Cambio de batería", "Afinación mayor", "Hojalatería y pintura"]
+RETURN_STATUS = ["Bueno", "Bueno", "Bueno", "Regular", "Dañado"]
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    """Configuración de la carga; se envía a cada proceso."""
+    seed: int = 42
+    cars: int = 10_000
+    customers: int = 5_000
+    rentals: int = 100_000
+    repairs: int = 40_000
+    days: int = 730 # días de historia hacia atrás desde end_date
+    distribution: str = "recent" # "uniform" o "recent" (más datos en fechas recientes)
+    open_rentals: float = 0.2 # proporción de autos con una renta abierta
+    end_date: date = date(2025, 1, 1)
+    batch_size: int = 5_000
+
+    @property
+    def end(self) -> datetime:
+        return datetime.combine(self.end_date, day_start.min, tzinfo=timezone.utc)
+
+    @property
+    def rented_cars(self) -> int:
+        """Número de autos con una renta abierta (los primeros autos)."""
+        return min(self.cars, self.rentals, int(self.cars * self.open_rentals))
+
+
+def object_id(config: SeedConfig, collection: str, index: int) -> ObjectId:
+    """Función que genera el ObjectId determinista de un documento a partir de su posición.
+
+    Permite referenciar autos y clientes sin leerlos de la base de datos.
+    """
+    timestamp = int(config.end.timestamp())
+    return ObjectId(struct.pack(">IB", timestamp, COLLECTIONS[collection]) + index.to_bytes(7, "big"))
+
+
+def days_ago(rng: random.Random, config: SeedConfig) -> float:
+    """Función que obtiene la antigüedad en días de un documento según la distribución."""
+    if config.distribution == "recent": # exponencial con media de un tercio del periodo
+        return min(config.days, rng.expovariate(3 / config.days))
+    return rng.uniform(0, config.days)
+
+
+def build_car(rng: random.Random, config: SeedConfig, index: int) -> dict[str, Any]:
+    brand = rng.choice(list(BRANDS))
+    rented = index < config.rented_cars # los primeros autos tienen una renta abierta
+    return {
+        "_id": object_id(config, "cars", index),
+        "brand": brand,
+        "model": rng.choice(BRANDS[brand]),
+        "year": rng.randint(2005, 2025),
+        "license_plate": f"{chr(65 + index % 26)}{chr(65 + index // 26 % 26)}{index:08d}",
+        "avaible": not rented,
+        "state": "Rentado" if rented else rng.choice(["Disponible", "Disponible", "Disponible", "Taller"]),
+        "updated_at": config.end,
+    }
+
+
+def build_customer(rng: random.Random, config: SeedConfig, index: int) -> dict[str, Any]:
+    first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "_id": object_id(config, "customers", index),
+        "name": f"{first_name} {last_name}",
+        "email": f"cliente{index}@example.com",
+        "phone_number": f"55{rng.randint(0, 99_999_999):08d}",
+        "address": f"Calle {rng.randint(1, 999)} #{rng.randint(1, 200)}, Ciudad",
+        "updated_at": config.end,
+    }
+
+
+def build_rental(rng: random.Random, config: SeedConfig, index: int) -> dict[str, Any]:
+    rental = {
+        "_id": object_id(config, "rentals", index),
+        "id_customer": object_id(config, "customers", rng.randrange(config.customers)),
+    }
+    days = rng.randint(1, 14) # duración de la renta
+    if index < config.rented_cars: # renta abierta del auto con la misma posición
+        start_date = config.end - timedelta(days=rng.uniform(0, days))
+        rental.update(id_car=object_id(config, "cars", index), start_date=start_date, returned=False)
+    else: # renta terminada de cualquier auto
+        start_date = config.end - timedelta(days=max(days, days_ago(rng, config)))
+        rental.update(
+            id_car=object_id(config, "cars", rng.randrange(config.cars)),
+            start_date=start_date,
+            end_date=start_date + timedelta(days=days),
+            returned=True,
+            return_status=rng.choice(RETURN_STATUS),
+        )
+    rental["total_amount"] = round(days * rng.uniform(400, 1500), 2)
+    rental["updated_at"] = rental.get("end_date", start_date)
+    return rental
+
+
+def build_repair(rng: random.Random, config: SeedConfig, index: int) -> dict[str, Any]:
+    registered_at = datetime.combine(
+        (config.end - timedelta(days=days_ago(rng, config))).date(), day_start.min, tzinfo=timezone.utc
+    )
+    return {
+        "_id": object_id(config, "repairs", index),
+        "id_car": object_id(config, "cars", rng.randrange(config.cars)),
+        "description": rng.choice(REPAIRS),
+        "mount": round(rng.lognormvariate(7.5, 0.8), 2), # la mayoría entre 500 y 5,000
+        "registered_at": registered_at,
+        "updated_at": registered_at,
+    }
+
+
+BUILDERS = {"cars": build_car, "customers": build_customer, "rentals": build_rental, "repairs": build_repair}
+
+
+def build_documents(config: SeedConfig, collection: str, start: int, stop: int) -> list[dict[str, Any]]:
+    """Función que genera los documentos de un lote de forma determinista.
+
+    Cada lote usa su propia semilla, por lo que el resultado no depende del
+    proceso ni del orden en que se generen los lotes.
+
+    Args:
+        config (SeedConfig): Configuración de la carga
+        collection (str): Colección del lote
+        start (int): Posición del primer documento
+        stop (int): Posición siguiente al último documento
+
+    Returns:
+        list[dict[str, Any]]: Documentos del lote
+    """
+    rng = random.Random(f"{config.seed}:{collection}:{start}")
+    build = BUILDERS[collection]
+    return [build(rng, config, index) for index in range(start, stop)]
+
+
+def plan_batches(config: SeedConfig) -> Iterator[tuple[str, int, int]]:
+    """Función que divide la carga en lotes (colección, inicio, fin)."""
+    for collection in COLLECTIONS:
+        total = getattr(config, collection)
+        for start in range(0, total, config.batch_size):
+            yield collection, start, min(start + config.batch_size, total)
+
+
+worker_database: Any = None # base de datos de cada proceso de carga
+
+
+def init_worker(mongo_uri: str, db_name: str) -> None:
+    """Función que abre la conexión de un proceso de carga."""
+    global worker_database
+    worker_database = MongoClient(mongo_uri)[db_name]
+
+
+def insert_batch(config: SeedConfig, collection: str, start: int, stop: int) -> tuple[str, int]:
+    """Función que genera e inserta un lote dentro de un proceso de carga."""
+    documents = build_documents(config, collection, start, stop)
+    worker_database[collection].insert_many(documents, ordered=False)
+    return collection, len(documents)
+
+
+def seed(config: SeedConfig, mongo_uri: str, db_name: str, workers: int) -> dict[str, int]:
+    """Función que carga todos los lotes con varios procesos en paralelo.
+
+    Args:
+        config (SeedConfig): Configuración de la carga
+        mongo_uri (str): Cadena de conexión a mongo
+        db_name (str): Nombre de la base de datos
+        workers (int): Número de procesos de carga
+
+    Returns:
+        dict[str, int]: Documentos insertados por colección
+    """
+    inserted = dict.fromkeys(COLLECTIONS, 0)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(mongo_uri, db_name)) as pool:
+        futures = [pool.submit(insert_batch, config, *batch) for batch in plan_batches(config)]
+        for done, future in enumerate(as_completed(futures), start=1):
+            collection, count = future.result()
+            inserted[collection] += count
+            print(f"\r{done}/{len(futures)} lotes", end="", flush=True)
+    print()
+    return inserted
+
+
+async def finish(collections: list[str]) -> None:
+    """Función que crea los índices, calcula las estadísticas por auto y publica una nueva
+    versión de las colecciones cargadas."""
+    from src.database.db import db
+    from src.database.indexes import ensure_indexes
+    from src.database.versioning import bump_collection_version
+    from src.database.queries.car_stats import rebuild_car_stats
+    import src.database.queries.cars, src.database.queries.customers # registro de índices
+    import src.database.queries.rentals, src.database.queries.repairs # registro de índices
+
+    await ensure_indexes(db)
+    await rebuild_car_stats(db)
+    for collection in collections: # las ETag y cachés de listados dejan de ser vigentes
+        await bump_collection_version(collection)
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos de Drive and Deal.")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default=os.getenv("MONGO_DB_NAME", "drive_and_deal_app"))
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--cars", type=int, default=defaults.cars)
+    parser.add_argument("--customers", type=int, default=defaults.customers)
+    parser.add_argument("--rentals", type=int, default=defaults.rentals)
+    parser.add_argument("--repairs", type=int, default=defaults.repairs)
+    parser.add_argument("--days", type=int, default=defaults.days, help="días de historia")
+    parser.add_argument("--distribution", choices=["uniform", "recent"], default=defaults.distribution)
+    parser.add_argument("--open-rentals", type=float, default=defaults.open_rentals,
+                        help="proporción de autos con una renta abierta")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="fecha final del periodo (YYYY-MM-DD); fíjala para resultados reproducibles")
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--drop", action="store_true", help="elimina las colecciones antes de cargar")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if (args.rentals or args.repairs) and not args.cars:
+        sys.exit("Las rentas y reparaciones requieren al menos un auto.")
+    if args.rentals and not args.customers:
+        sys.exit("Las rentas requieren al menos un cliente.")
+
+    config = SeedConfig(
+        seed=args.seed, cars=args.cars, customers=args.customers, rentals=args.rentals,
+        repairs=args.repairs, days=args.days, distribution=args.distribution,
+        open_rentals=args.open_rentals, end_date=args.end_date, batch_size=args.batch_size,
+    )
+
+    if args.drop:
+        database = MongoClient(args.mongo_uri)[args.db_name]
+        for collection in COLLECTIONS:
+            database.drop_collection(collection)
+
+    started = time.perf_counter()
+    inserted = seed(config, args.mongo_uri, args.db_name, args.workers)
+    elapsed = time.perf_counter() - started
+    total = sum(inserted.values())
+    print(f"{total} documentos en {elapsed:.1f} s ({total / elapsed:,.0f} doc/s): {inserted}")
+
+    # la aplicación se configura con la misma base de datos para crear sus índices
+    os.environ["MONGO_URI"], os.environ["MONGO_DB_NAME"] = args.mongo_uri, args.db_name
+    asyncio.run(finish(list(COLLECTIONS)))
+
+
+if __name__ == "__main__":
+    main()